@@ -12,3 +12,7 @@ class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
     verbose_name = 'Authentication'
+
+    def ready(self):
+        """Connect the app's signal handlers."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,21 @@
+"""
+Password hashers for LiquidChat.
+
+This module provides the password hasher used for new passwords. It tunes
+Django's Argon2 hasher so signups and logins stay cheap enough for a busy
+authentication endpoint while keeping memory-hard hashing.
+"""
+
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 hasher with a smaller memory cost than Django's default.
+
+    Existing hashes produced with other parameters are still verified and
+    are transparently upgraded on the next successful login.
+    """
+
+    time_cost = 2
+    memory_cost = 65536
@@ -0,0 +1,70 @@
+"""
+Management command to persist buffered last_seen timestamps.
+
+User.update_last_seen() buffers timestamps in Redis instead of writing to
+the database on every call. This command drains the buffer and writes all
+pending timestamps in bulk. A buffered timestamp older than the stored one
+(e.g. written by the WebSocket consumers in the meantime) is skipped. Run
+it periodically, e.g. every 30-60 seconds from cron or a scheduler.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from apps.authentication.models import User
+from apps.core.cache import get_redis_client
+
+
+def parse_timestamp(value):
+    """
+    Parse a buffered last_seen value.
+
+    Args:
+        value: ISO 8601 bytes, or integer epoch seconds written by
+            earlier versions
+
+    Returns:
+        datetime: The aware timestamp
+    """
+    value = value.decode()
+    if value.isdigit():
+        return datetime.fromtimestamp(int(value), tz=dt_timezone.utc)
+    return datetime.fromisoformat(value)
+
+
+class Command(BaseCommand):
+    """Write buffered last_seen timestamps from Redis to the database."""
+
+    help = 'Write buffered last_seen timestamps from Redis to the database.'
+
+    def handle(self, *args, **options):
+        """Drain the user_last_seen:* keys and bulk update the users."""
+        client = get_redis_client()
+        if client is None:
+            self.stdout.write('Cache is not Redis-backed; nothing to flush.')
+            return
+
+        prefix = cache.make_key('user_last_seen:')
+        keys = list(client.scan_iter(match=f'{prefix}*', count=1000))
+        if not keys:
+            return
+
+        # GETDEL reads and clears each key atomically, so timestamps written
+        # while the flush runs are kept for the next one.
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.getdel(key)
+        values = pipe.execute()
+
+        timestamps = {
+            key.decode()[len(prefix):]: parse_timestamp(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+        updated = User.advance_last_seen(timestamps)
+
+        self.stdout.write(
+            f'Flushed last_seen for {len(timestamps)} user(s), {updated} updated.'
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-14 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_user_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'username'], name='users_is_acti_3dd191_idx'),
+        ),
+    ]
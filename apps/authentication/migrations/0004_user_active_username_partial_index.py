@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-14 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_user_active_username_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_is_acti_3dd191_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['is_active', 'username'], name='users_active_username_idx'),
+        ),
+    ]
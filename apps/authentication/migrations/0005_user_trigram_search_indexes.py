@@ -0,0 +1,44 @@
+"""
+Trigram indexes backing admin search on users.
+
+Django admin searches with ``icontains``, which PostgreSQL runs as
+``UPPER(col::text) LIKE UPPER('%term%')``. A btree index can't serve a
+leading wildcard, but a pg_trgm GIN index on the same expression can.
+The indexes are PostgreSQL-only; other backends skip this migration.
+"""
+
+from django.db import migrations
+
+INDEXES = [
+    ('users_username_trgm', 'users', 'username'),
+    ('users_email_trgm', 'users', 'email'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_user_active_username_partial_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -33,6 +33,10 @@ class User(AbstractUser):
         last_seen: Timestamp of the user's last activity
     """
 
+    # The UUID is deliberately the primary key, not a separate public id:
+    # it is the user id in JWT claims, WebSocket payloads, presence keys and
+    # URLs, so switching to a bigint key would mean rewriting every FK and
+    # invalidating all issued tokens.
     id = models.UUIDField(
         primary_key=True,
         default=uuid.uuid4,
@@ -79,6 +83,14 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        indexes = [
+            # Partial index: the user list only ever scans active users.
+            models.Index(
+                fields=['is_active', 'username'],
+                name='users_active_username_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         """Return string representation of the user."""
@@ -91,14 +103,70 @@ class User(AbstractUser):
 
         This property checks Redis for the user's presence status.
         The actual status is managed by the presence system in Django Channels.
+        It isn't memoized: instances can outlive a request (e.g. the cached
+        WebSocket users), so each access reads the current status.
+        Serializers memoize presence per response instead.
 
         Returns:
             bool: True if the user is online, False otherwise
         """
-        from django.core.cache import cache
-        return cache.get(f'user_presence:{self.id}') is not None
+        from apps.chat.presence import is_user_online
+        return is_user_online(self.id)
 
     def update_last_seen(self):
-        """Update the last_seen timestamp to current time."""
+        """
+        Update the last_seen timestamp to current time.
+
+        With a Redis cache the timestamp is buffered under
+        ``user_last_seen:<id>`` as an ISO 8601 string and written to the
+        database in bulk by the ``flush_last_seen`` management command.
+        Without Redis it is written immediately with a single UPDATE,
+        skipping save() and its signals.
+        """
+        from django.core.cache import cache
+        from apps.core.cache import get_redis_client
+
         self.last_seen = timezone.now()
-        self.save(update_fields=['last_seen'])
+
+        client = get_redis_client()
+        if client is not None:
+            # Written raw rather than pickled, so the flush can parse it
+            client.set(
+                cache.make_key(f'user_last_seen:{self.id}'),
+                self.last_seen.isoformat()
+            )
+        else:
+            type(self).advance_last_seen({self.pk: self.last_seen})
+
+    @classmethod
+    def advance_last_seen(cls, timestamps, batch_size=500):
+        """
+        Write last_seen timestamps, never moving a user's value backwards.
+
+        last_seen is written by several buffers (the Redis buffer drained
+        by ``flush_last_seen`` and the consumers' in-process buffer) on
+        their own schedules, so a flush may carry an older timestamp than
+        the one already stored. Each batch is one UPDATE that only touches
+        rows whose stored value is missing or older.
+
+        Args:
+            timestamps: Mapping of user ID to aware datetime
+            batch_size: Number of users per UPDATE
+
+        Returns:
+            int: Number of users whose last_seen was changed
+        """
+        items = list(timestamps.items())
+        updated = 0
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            newest = models.Case(
+                *[models.When(pk=user_id, then=models.Value(timestamp))
+                  for user_id, timestamp in batch],
+                output_field=models.DateTimeField(),
+            )
+            updated += cls.objects.filter(
+                models.Q(last_seen__isnull=True) | models.Q(last_seen__lt=newest),
+                pk__in=[user_id for user_id, _ in batch],
+            ).update(last_seen=newest)
+        return updated
@@ -7,14 +7,19 @@ These serializers handle data validation and transformation for REST API endpoin
 
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import models
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt import serializers as jwt_serializers
 
+from apps.chat.presence import get_online_users
+from apps.core.serializers import CachedFieldsModelSerializer
 from .models import User
+from .tokens import BlacklistableRefreshToken
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(CachedFieldsModelSerializer):
     """
     Serializer for user registration.
 
@@ -99,16 +104,14 @@ class UserLoginSerializer(serializers.Serializer):
         username = attrs.get('username')
         password = attrs.get('password')
 
-        # Try to find user by username
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
-            raise serializers.ValidationError({
-                'detail': 'Invalid credentials.'
-            })
-
-        # Authenticate
-        if not user.check_password(password):
+        # authenticate() runs the hasher even for unknown usernames, so
+        # response timing doesn't reveal whether an account exists.
+        user = authenticate(
+            request=self.context.get('request'),
+            username=username,
+            password=password,
+        )
+        if user is None:
             raise serializers.ValidationError({
                 'detail': 'Invalid credentials.'
             })
@@ -122,7 +125,89 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 
-class UserSerializer(serializers.ModelSerializer):
+USER_CARD_TIMEOUT = 3600
+
+
+def user_card_key(user):
+    """
+    Return the cache key for a user's cached representation.
+
+    The key embeds the ``last_seen`` timestamp, so a card stops matching as
+    soon as ``last_seen`` changes, including through bulk updates that
+    don't send signals. Other field changes refresh the card on save.
+
+    Args:
+        user: User instance
+
+    Returns:
+        str: Cache key for the user's card
+    """
+    version = int(user.last_seen.timestamp() * 1_000_000) if user.last_seen else 0
+    return f'user_card:{user.id}:{version}'
+
+
+class PresenceBatchedListSerializer(serializers.ListSerializer):
+    """
+    List serializer that renders users from two bulk cache reads.
+
+    Instead of one Redis GET per row, the online status of every user in the
+    list is fetched with a single ``get_many`` and memoized in the
+    serializer context (see UserSerializer.get_is_online). The stable part
+    of each user's representation (its "card") is read with a second
+    ``get_many``; only cache misses are serialized field by field, then
+    stored for next time.
+
+    Rendered users are also memoized in the serializer context, so a user
+    who appears in several nested lists of one response (e.g. the viewer in
+    every conversation's participants) is only rendered once.
+
+    Child serializers whose ``cache_cards`` is False render their cards
+    directly, for representations cheaper to build than to fetch.
+    """
+
+    def to_representation(self, data):
+        """Merge cached user cards with live presence."""
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        users = list(iterable)
+
+        # The context dict is shared by the whole serializer tree of one
+        # response; a serializer without context gets a throwaway dict.
+        rendered = self.context.setdefault('rendered_users', {}).setdefault(
+            type(self.child), {}
+        )
+        pending = [user for user in users if user.id not in rendered]
+
+        if pending:
+            presence = self.context.setdefault('presence', {})
+            unknown = [user.id for user in pending if user.id not in presence]
+            if unknown:
+                presence.update(get_online_users(unknown))
+
+            if not self.child.cache_cards:
+                for user in pending:
+                    rendered[user.id] = item = self.child.to_card(user)
+                    item['is_online'] = presence[user.id]
+                return [rendered[user.id] for user in users]
+
+            keys = [user_card_key(user) for user in pending]
+            cards = cache.get_many(keys)
+            missing = {}
+
+            for user, key in zip(pending, keys):
+                card = cards.get(key)
+                if card is None:
+                    card = missing[key] = self.child.to_card(user)
+                item = dict(card)
+                item['is_online'] = presence[user.id]
+                rendered[user.id] = item
+
+            if missing:
+                cache.set_many(missing, USER_CARD_TIMEOUT)
+
+        return [rendered[user.id] for user in users]
+
+
+class UserSerializer(CachedFieldsModelSerializer):
     """
     Serializer for user data representation.
 
@@ -132,8 +217,14 @@ class UserSerializer(serializers.ModelSerializer):
         is_online: Boolean indicating if user is currently online
     """
 
+    # Presence is memoized in the serializer context for one response; list
+    # serializers fill it in for the whole page in one batch.
     is_online = serializers.SerializerMethodField()
 
+    # Whether list serializers cache this representation's stable fields
+    # (see PresenceBatchedListSerializer and user_card_key)
+    cache_cards = True
+
     class Meta:
         model = User
         fields = [
@@ -144,45 +235,46 @@ class UserSerializer(serializers.ModelSerializer):
             'last_seen',
         ]
         read_only_fields = ['id', 'created_at', 'last_seen']
+        list_serializer_class = PresenceBatchedListSerializer
 
-    def get_is_online(self, obj):
+    def get_is_online(self, instance):
         """
-        Get the user's online status.
-
-        Uses Redis cache to determine if the user is currently online.
-        This status is updated by the presence system in Django Channels.
+        Return the user's online status, looked up once per response.
 
         Args:
-            obj: User instance
+            instance: User instance
 
         Returns:
-            bool: True if user is online, False otherwise
+            bool: True if the user is online
         """
-        from django.core.cache import cache
-        return cache.get(f'user_presence:{obj.id}') is not None
-
-
-class CustomTokenRefreshSerializer(TokenRefreshSerializer):
-    """
-    Custom token refresh serializer.
+        presence = self.context.setdefault('presence', {})
+        if instance.id not in presence:
+            presence.update(get_online_users([instance.id]))
+        return presence[instance.id]
 
-    Extends the default JWT refresh serializer to include additional
-    user information in the response.
-    """
-
-    def validate(self, attrs):
-        """Validate refresh token and return new access token with user info."""
-        data = super().validate(attrs)
+    def to_card(self, instance):
+        """
+        Serialize a user without looking up presence.
 
-        # Optionally, you can add custom data here
-        # For example, include user ID from the token
-        from rest_framework_simplejwt.tokens import Token
-        token = attrs['refresh']
+        The ``is_online`` slot is kept (as None) so the field order matches
+        ``to_representation`` once the live status is filled in.
 
-        # You could decode the token to get user info
-        # But for security, typically you'd refresh and let client handle it
+        Args:
+            instance: User instance
 
-        return data
+        Returns:
+            dict: Representation of the user's stable fields
+        """
+        card = {}
+        for field in self._readable_fields:
+            if field.field_name == 'is_online':
+                card['is_online'] = None
+                continue
+            attribute = field.get_attribute(instance)
+            card[field.field_name] = (
+                None if attribute is None else field.to_representation(attribute)
+            )
+        return card
 
 
 class LogoutSerializer(serializers.Serializer):
@@ -196,3 +288,14 @@ class LogoutSerializer(serializers.Serializer):
         required=True,
         help_text="Refresh token to be blacklisted"
     )
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Serializer for refreshing a JWT pair.
+
+    Uses refresh tokens that can be revoked, so rotated and logged out
+    tokens are rejected.
+    """
+
+    token_class = BlacklistableRefreshToken
@@ -0,0 +1,29 @@
+"""
+Signal handlers for the authentication app.
+
+This module keeps cached user data in sync with the database.
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User
+from .serializers import USER_CARD_TIMEOUT, UserSerializer, user_card_key
+
+
+@receiver(post_save, sender=User)
+def refresh_user_card(sender, instance, **kwargs):
+    """
+    Store a fresh card for a user whenever the user is saved.
+
+    Args:
+        sender: The User model class
+        instance: The saved User instance
+        **kwargs: Additional signal arguments
+    """
+    cache.set(
+        user_card_key(instance),
+        UserSerializer().to_card(instance),
+        USER_CARD_TIMEOUT
+    )
@@ -1,10 +1,17 @@
 """
 Tests for authentication app.
 """
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.authentication.serializers import user_card_key
 
 User = get_user_model()
 
@@ -26,6 +33,36 @@ class UserModelTest(TestCase):
         self.assertFalse(user.is_staff)
         self.assertFalse(user.is_superuser)
 
+    def test_advance_last_seen_never_moves_backwards(self):
+        """Test that only missing or older last_seen values are replaced."""
+        now = timezone.now()
+        newer = User.objects.create_user(username='newer', password='testpass123')
+        older = User.objects.create_user(username='older', password='testpass123')
+        User.objects.filter(pk=newer.pk).update(last_seen=now)
+        User.objects.filter(pk=older.pk).update(last_seen=now - timedelta(hours=1))
+        unseen = User.objects.create_user(username='unseen', password='testpass123')
+
+        stale = now - timedelta(minutes=5)
+        updated = User.advance_last_seen({
+            newer.pk: stale, older.pk: stale, unseen.pk: stale
+        })
+
+        self.assertEqual(updated, 2)
+        for user in (newer, older, unseen):
+            user.refresh_from_db()
+        self.assertEqual(newer.last_seen, now)
+        self.assertEqual(older.last_seen, stale)
+        self.assertEqual(unseen.last_seen, stale)
+
+    def test_card_key_changes_within_a_second(self):
+        """Test that every last_seen write gets a new user card key."""
+        user = User.objects.create_user(username='card', password='testpass123')
+        user.last_seen = timezone.now().replace(microsecond=1000)
+        first = user_card_key(user)
+
+        user.last_seen = user.last_seen.replace(microsecond=2000)
+        self.assertNotEqual(user_card_key(user), first)
+
 
 class AuthenticationAPITest(APITestCase):
     """Test authentication API endpoints."""
@@ -78,3 +115,104 @@ class AuthenticationAPITest(APITestCase):
         )
         response = self.client.post(self.signup_url, self.user_data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LogoutViewTest(APITestCase):
+    """Test the logout endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='leaving',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        """Clear revoked tokens stored by the tests."""
+        cache.clear()
+
+    def test_logout_with_valid_token(self):
+        """Test logging out with a valid refresh token."""
+        refresh = RefreshToken.for_user(self.user)
+
+        response = self.client.post('/api/auth/logout/', {'refresh': str(refresh)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logged_out_token_cannot_refresh(self):
+        """Test that logging out revokes the refresh token."""
+        refresh = str(RefreshToken.for_user(self.user))
+        self.client.post('/api/auth/logout/', {'refresh': refresh})
+
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_cannot_refresh_again(self):
+        """Test that a refresh token is revoked once it has been rotated."""
+        refresh = str(RefreshToken.for_user(self.user))
+
+        first = self.client.post('/api/auth/token/refresh/', {'refresh': refresh})
+        again = self.client.post('/api/auth/token/refresh/', {'refresh': refresh})
+        rotated = self.client.post(
+            '/api/auth/token/refresh/', {'refresh': first.data['refresh']}
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(rotated.status_code, status.HTTP_200_OK)
+
+    def test_logout_with_malformed_token(self):
+        """Test that a malformed token is rejected."""
+        response = self.client.post('/api/auth/logout/', {'refresh': 'not-a-jwt'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserListViewTest(APITestCase):
+    """Test the user discovery endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='viewer',
+            password='testpass123'
+        )
+        self.others = [
+            User.objects.create_user(username=f'user{i}', password='testpass123')
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        """Clear presence keys set by the tests."""
+        cache.clear()
+
+    def test_presence_is_batched(self):
+        """Test that presence is read in bulk rather than once per user."""
+        cache.set(f'user_presence:{self.others[0].id}', True, 60)
+
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            response = self.client.get('/api/auth/users/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # One read for presence, one for the cached user cards.
+        self.assertEqual(get_many.call_count, 2)
+
+        online = {u['username']: u['is_online'] for u in response.data['results']}
+        self.assertEqual(online, {'user0': True, 'user1': False, 'user2': False})
+
+    def test_username_change_refreshes_card(self):
+        """Test that a renamed user is not served from a stale card."""
+        self.client.get('/api/auth/users/')
+
+        renamed = self.others[1]
+        renamed.username = 'renamed'
+        renamed.save()
+
+        response = self.client.get('/api/auth/users/')
+
+        usernames = [u['username'] for u in response.data['results']]
+        self.assertIn('renamed', usernames)
+        self.assertNotIn('user1', usernames)
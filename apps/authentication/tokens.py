@@ -0,0 +1,54 @@
+"""
+JWT token classes for the authentication app.
+
+simplejwt's own blacklist needs its token_blacklist app, which stores every
+issued and revoked token in two tables and queries them on each refresh.
+Here a revoked refresh token's ID is kept in the cache instead, for as long
+as the token would have been valid.
+"""
+
+import time
+
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def blacklist_cache_key(jti):
+    """Return the cache key marking the refresh token ``jti`` as revoked."""
+    return f'jwt:bl:{jti}'
+
+
+class BlacklistableRefreshToken(RefreshToken):
+    """
+    Refresh token that can be revoked through the cache.
+
+    Revoked tokens fail verification, so they can neither be refreshed
+    nor rotated again. simplejwt's refresh serializer calls blacklist()
+    on rotation when BLACKLIST_AFTER_ROTATION is set.
+    """
+
+    def verify(self, *args, **kwargs):
+        """Verify the token, rejecting it if it has been revoked."""
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        """
+        Raise TokenError if this token has been revoked.
+
+        Raises:
+            TokenError: If the token is blacklisted
+        """
+        if cache.get(blacklist_cache_key(self.payload[api_settings.JTI_CLAIM])):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        """Revoke this token until it expires."""
+        timeout = max(int(self.payload['exp'] - time.time()), 1)
+        cache.set(
+            blacklist_cache_key(self.payload[api_settings.JTI_CLAIM]),
+            True,
+            timeout
+        )
@@ -6,13 +6,13 @@ registration, login, logout, and user discovery. All views use JWT authenticatio
 """
 
 from django.contrib.auth import logout
+from django.db.models import Q
 from rest_framework import status
 from rest_framework.generics import ListAPIView, CreateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenRefreshView
+from rest_framework_simplejwt.exceptions import TokenError
 
 from .models import User
 from .serializers import (
@@ -21,6 +21,27 @@ from .serializers import (
     UserSerializer,
     LogoutSerializer,
 )
+from .tokens import BlacklistableRefreshToken
+
+
+def get_tokens_for_user(user):
+    """
+    Issue a new JWT pair for a user.
+
+    Each token is signed exactly once: the access token is derived from the
+    refresh token and both are encoded a single time.
+
+    Args:
+        user: The authenticated User instance
+
+    Returns:
+        dict: The encoded ``access`` and ``refresh`` tokens
+    """
+    refresh = BlacklistableRefreshToken.for_user(user)
+    return {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+    }
 
 
 class UserRegistrationView(CreateAPIView):
@@ -47,13 +68,9 @@ class UserRegistrationView(CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
-
         return Response({
             'user': UserSerializer(user).data,
-            'access': str(refresh.access_token),
-            'refresh': str(refresh),
+            **get_tokens_for_user(user),
         }, status=status.HTTP_201_CREATED)
 
 
@@ -77,36 +94,20 @@ class UserLoginView(APIView):
 
     def post(self, request, *args, **kwargs):
         """Authenticate user and return JWT tokens."""
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(
+            data=request.data,
+            context={'request': request}
+        )
         serializer.is_valid(raise_exception=True)
 
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
 
         return Response({
             'user': UserSerializer(user).data,
-            'access': str(refresh.access_token),
-            'refresh': str(refresh),
+            **get_tokens_for_user(user),
         }, status=status.HTTP_200_OK)
 
 
-class CustomTokenRefreshView(TokenRefreshView):
-    """
-    API endpoint for token refresh.
-
-    Refreshes the access token using a valid refresh token.
-
-    Methods:
-        POST: Refresh access token
-
-    Response:
-        200: New access token
-        401: Invalid refresh token
-    """
-
-    permission_classes = [AllowAny]
-
-
 class LogoutView(APIView):
     """
     API endpoint for user logout.
@@ -131,26 +132,35 @@ class LogoutView(APIView):
 
         refresh_token = serializer.validated_data['refresh']
 
-        try:
-            token = RefreshToken(refresh_token)
-            token.blacklist()
-
-            # Update last seen
-            request.user.update_last_seen()
-
-            # Logout from Django
-            logout(request)
-
+        # A JWT always has three dot-separated segments; reject anything
+        # else before paying for a full decode and signature check.
+        if refresh_token.count('.') != 2:
             return Response(
-                {'detail': 'Successfully logged out.'},
-                status=status.HTTP_200_OK
+                {'detail': 'Invalid token.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except Exception as e:
+
+        try:
+            token = BlacklistableRefreshToken(refresh_token)
+        except TokenError:
             return Response(
                 {'detail': 'Invalid token.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        token.blacklist()
+
+        # Update last seen
+        request.user.update_last_seen()
+
+        # Logout from Django
+        logout(request)
+
+        return Response(
+            {'detail': 'Successfully logged out.'},
+            status=status.HTTP_200_OK
+        )
+
 
 class UserListView(ListAPIView):
     """
@@ -181,9 +191,10 @@ class UserListView(ListAPIView):
         search = self.request.query_params.get('search', None)
         if search:
             queryset = queryset.filter(
-                username__icontains=search
-            ) | queryset.filter(
-                email__icontains=search
+                Q(username__icontains=search) | Q(email__icontains=search)
             )
 
-        return queryset.order_by('username')
+        # Only load the columns UserSerializer actually renders
+        return queryset.only(
+            'id', 'username', 'created_at', 'last_seen'
+        ).order_by('username')
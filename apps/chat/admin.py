@@ -21,6 +21,10 @@ class ConversationAdmin(admin.ModelAdmin):
     filter_horizontal = ('participants',)
     readonly_fields = ('id', 'created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        """Prefetch participants so the changelist doesn't query per row."""
+        return super().get_queryset(request).prefetch_related('participants')
+
     def get_participants(self, obj):
         """Get a string representation of participants."""
         return ', '.join([p.username for p in obj.participants.all()])
@@ -34,12 +38,24 @@ class PrivateMessageAdmin(admin.ModelAdmin):
     Admin configuration for the PrivateMessage model.
     """
 
-    list_display = ('id', 'sender', 'conversation', 'content_preview', 'timestamp', 'is_read')
+    list_display = ('id', 'sender', 'get_conversation', 'content_preview', 'timestamp', 'is_read')
+    list_select_related = ('sender',)
     list_filter = ('is_read', 'timestamp')
     search_fields = ('content', 'sender__username', 'sender__email')
     readonly_fields = ('id', 'timestamp')
     raw_id_fields = ('conversation', 'sender')
 
+    def get_conversation(self, obj):
+        """
+        Show the conversation ID.
+
+        Conversation.__str__ queries the participants, which would cost
+        queries per row; the ID is already on the message.
+        """
+        return obj.conversation_id
+
+    get_conversation.short_description = 'Conversation'
+
     def content_preview(self, obj):
         """Show a preview of the message content."""
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
@@ -54,6 +70,7 @@ class GlobalMessageAdmin(admin.ModelAdmin):
     """
 
     list_display = ('id', 'sender', 'content_preview', 'timestamp')
+    list_select_related = ('sender',)
     list_filter = ('timestamp',)
     search_fields = ('content', 'sender__username', 'sender__email')
     readonly_fields = ('id', 'timestamp')
@@ -13,3 +13,7 @@ class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.chat'
     verbose_name = 'Chat'
+
+    def ready(self):
+        """Connect the app's signal handlers."""
+        from . import signals  # noqa: F401
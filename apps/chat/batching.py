@@ -0,0 +1,179 @@
+"""
+Write and broadcast coalescing for the chat consumers.
+
+WebSocket connections open and close far more often than the data they
+touch needs to be persisted. This module buffers such writes in process
+and flushes them to the database in bulk, so a burst of disconnects costs
+one query instead of one per socket. Broadcasts get the same treatment:
+events for a group are collected for a few milliseconds and sent as one
+batch through the channel layer.
+"""
+
+import asyncio
+import logging
+
+import orjson
+from channels.db import database_sync_to_async
+
+from apps.authentication.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastSeenBuffer:
+    """
+    Coalesce last_seen updates and write them in bulk.
+
+    Only the latest timestamp per user is kept. Writes go through
+    User.advance_last_seen(), like the Redis buffer drained by
+    ``flush_last_seen``, so whichever of the two flushes last never moves
+    a user's last_seen backwards. The buffer is flushed
+    ``interval`` seconds after the first pending entry, or immediately
+    once ``max_size`` users are pending.
+
+    Attributes:
+        interval: Seconds to wait before flushing pending entries
+        max_size: Number of pending users that triggers an early flush
+    """
+
+    def __init__(self, interval=0.5, max_size=200):
+        """Initialize an empty buffer."""
+        self.interval = interval
+        self.max_size = max_size
+        self._pending = {}
+        self._timer = None
+        self._tasks = set()
+
+    def add(self, user_id, timestamp):
+        """
+        Record a user's last_seen timestamp.
+
+        Must be called from the event loop; it never blocks or touches
+        the database.
+
+        Args:
+            user_id: UUID of the user
+            timestamp: Aware datetime of the user's last activity
+        """
+        self._pending[user_id] = timestamp
+
+        loop = asyncio.get_running_loop()
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.interval, self._start_flush)
+
+    def _start_flush(self):
+        """Run flush() in a task, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Write all pending timestamps to the database."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        try:
+            await self._write(pending)
+        except Exception:
+            logger.exception('Failed to flush last_seen for %d user(s)', len(pending))
+
+    @database_sync_to_async
+    def _write(self, pending):
+        """Persist a {user_id: timestamp} mapping, keeping newer values."""
+        User.advance_last_seen(pending)
+
+
+class GroupSendBatcher:
+    """
+    Coalesce channel layer broadcasts into batch events.
+
+    Messages added for a group within ``window`` seconds are sent as a
+    single ``group_send`` of type ``batch_type``. The event's ``payload``
+    is the batch frame, JSON encoded once, so each consumer in the group
+    receives one event and forwards it as one WebSocket frame.
+
+    Flushes are serialized, so batches for a group are sent in the order
+    their messages were added even when a size-triggered flush overlaps a
+    timed one.
+
+    Attributes:
+        batch_type: Event type of the batch, i.e. the consumer handler name
+        window: Seconds to collect messages before sending
+        max_size: Number of messages in a group that triggers an early send
+    """
+
+    def __init__(self, batch_type, window=0.010, max_size=100):
+        """Initialize an empty batcher."""
+        self.batch_type = batch_type
+        self.window = window
+        self.max_size = max_size
+        self._pending = {}
+        self._channel_layer = None
+        self._timer = None
+        self._tasks = set()
+        self._lock = asyncio.Lock()
+
+    def add(self, channel_layer, group, message):
+        """
+        Queue a message for a group.
+
+        Must be called from the event loop; it never blocks.
+
+        Args:
+            channel_layer: The channel layer to send through
+            group: Name of the group to broadcast to
+            message: JSON-serializable message payload
+        """
+        self._channel_layer = channel_layer
+        messages = self._pending.setdefault(group, [])
+        messages.append(message)
+
+        loop = asyncio.get_running_loop()
+        if len(messages) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+
+    def _start_flush(self):
+        """Run flush() in a task, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """
+        Send one batch event per group with pending messages.
+
+        Waits for any flush already in progress, so batches never overtake
+        each other.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            for group, messages in pending.items():
+                try:
+                    await self._channel_layer.group_send(group, {
+                        'type': self.batch_type,
+                        'payload': orjson.dumps({
+                            'type': self.batch_type,
+                            'messages': messages,
+                        }).decode(),
+                    })
+                except Exception:
+                    logger.exception(
+                        'Failed to send %d message(s) to %s', len(messages), group
+                    )
+
+
+last_seen_buffer = LastSeenBuffer()
+global_message_batcher = GroupSendBatcher('global_message_batch')
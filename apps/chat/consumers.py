@@ -4,18 +4,28 @@ Django Channels consumers for real-time chat.
 This module provides WebSocket consumers for global and private chat functionality.
 Consumers handle WebSocket connections, message routing, presence management,
 and integration with the Django ORM through asynchronous methods.
+
+Events sent through the channel layer carry their WebSocket frame already
+JSON encoded in ``payload``, so a broadcast is encoded once rather than once
+per receiving consumer.
 """
 
-import json
-import bleach
+import asyncio
+import logging
+
+import orjson
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.conf import settings
-from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
+from . import presence
+from .batching import global_message_batcher, last_seen_buffer
 from .models import Conversation, PrivateMessage, GlobalMessage
-from apps.authentication.models import User
+
+logger = logging.getLogger(__name__)
 
 
 class GlobalChatConsumer(AsyncWebsocketConsumer):
@@ -28,7 +38,7 @@ class GlobalChatConsumer(AsyncWebsocketConsumer):
 
     WebSocket Events:
         send_global_message: Client sends a message to the global chat
-        global_message: Server broadcasts a message to all clients
+        global_message_batch: Server broadcasts a batch of messages to all clients
         user_presence: Server notifies about user online/offline status
     """
 
@@ -44,31 +54,37 @@ class GlobalChatConsumer(AsyncWebsocketConsumer):
             return
 
         self.user = self.scope['user']
+        self.user_id = str(self.user.id)
         self.group_name = 'global_chat'
 
+        # Mark user as online and broadcast it before joining the group,
+        # so the channel layer never delivers the event back to us
+        await asyncio.gather(
+            self.set_user_online(self.user.id),
+            self.channel_layer.group_send(
+                self.group_name,
+                {
+                    'type': 'user_presence',
+                    'user_id': self.user_id,
+                    'payload': orjson.dumps({
+                        'type': 'user_presence',
+                        'user_id': self.user_id,
+                        'username': self.user.username,
+                        'status': 'online',
+                    }).decode(),
+                }
+            ),
+        )
+
         # Join global chat group
         await self.channel_layer.group_add(
             self.group_name,
             self.channel_name
         )
 
-        # Mark user as online
-        await self.set_user_online(self.user.id)
-
         # Accept the connection
         await self.accept()
 
-        # Broadcast user joined
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                'type': 'user_presence',
-                'user_id': str(self.user.id),
-                'username': self.user.username,
-                'status': 'online',
-            }
-        )
-
     async def disconnect(self, close_code):
         """
         Handle WebSocket disconnection.
@@ -77,26 +93,31 @@ class GlobalChatConsumer(AsyncWebsocketConsumer):
         offline status. Updates the user's last_seen timestamp.
         """
         if hasattr(self, 'user') and self.user and not self.user.is_anonymous:
-            # Leave global chat group
-            await self.channel_layer.group_discard(
-                self.group_name,
-                self.channel_name
+            # Leave global chat group and mark user as offline concurrently
+            await asyncio.gather(
+                self.channel_layer.group_discard(
+                    self.group_name,
+                    self.channel_name
+                ),
+                self.set_user_offline(self.user.id),
             )
 
-            # Mark user as offline
-            await self.set_user_offline(self.user.id)
-
-            # Update last seen
-            await self.update_user_last_seen(self.user.id)
+            # Queue last seen update; it is written in bulk shortly after
+            last_seen_buffer.add(self.user.id, timezone.now())
 
-            # Broadcast user left
+            # Broadcast user left; we already left the group, so the
+            # event isn't delivered back to us
             await self.channel_layer.group_send(
                 self.group_name,
                 {
                     'type': 'user_presence',
-                    'user_id': str(self.user.id),
-                    'username': self.user.username,
-                    'status': 'offline',
+                    'user_id': self.user_id,
+                    'payload': orjson.dumps({
+                        'type': 'user_presence',
+                        'user_id': self.user_id,
+                        'username': self.user.username,
+                        'status': 'offline',
+                    }).decode(),
                 }
             )
 
@@ -110,56 +131,51 @@ class GlobalChatConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
 
             if message_type == 'send_global_message':
                 content = data.get('content', '').strip()
 
-                if not content:
+                # Drop empty messages and payloads far beyond the limit
+                # before doing any work on them
+                if not content or len(content) > settings.MESSAGE_MAX_LENGTH * 8:
                     return
 
-                # Sanitize content
-                content = self.sanitize_content(content)
+                # Truncate before the model sanitizes the content, so the
+                # sanitizer only ever sees bounded input
+                content = content[:settings.MESSAGE_MAX_LENGTH]
 
-                # Validate length
-                if len(content) > settings.MESSAGE_MAX_LENGTH:
-                    content = content[:settings.MESSAGE_MAX_LENGTH]
-
-                # Save message to database
+                # Save message to database; the model sanitizes the content
                 message = await self.save_global_message(self.user.id, content)
 
-                # Broadcast to all users in the group
-                await self.channel_layer.group_send(
+                # Broadcast to all users in the group, batched with other
+                # messages sent in the same few milliseconds
+                global_message_batcher.add(
+                    self.channel_layer,
                     self.group_name,
                     {
-                        'type': 'global_message',
-                        'message': {
-                            'id': message['id'],
-                            'sender': {
-                                'id': str(self.user.id),
-                                'username': self.user.username,
-                            },
-                            'content': content,
-                            'timestamp': message['timestamp'],
+                        'id': message['id'],
+                        'sender': {
+                            'id': str(self.user.id),
+                            'username': self.user.username,
                         },
+                        'content': message['content'],
+                        'timestamp': message['timestamp'],
                     }
                 )
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
-    async def global_message(self, event):
+    async def global_message_batch(self, event):
         """
-        Send global message to WebSocket.
+        Send a batch of global messages to WebSocket.
 
-        This handler is called when the global chat group broadcasts
-        a new message.
+        This handler is called when the global message batcher flushes
+        messages sent to the global chat group.
         """
-        await self.send(text_data=json.dumps({
-            'type': 'global_message',
-            'message': event['message'],
-        }))
+        await self.send(text_data=event['payload'])
 
     async def user_presence(self, event):
         """
@@ -167,38 +183,31 @@ class GlobalChatConsumer(AsyncWebsocketConsumer):
 
         This handler is called when a user's online/offline status changes.
         """
-        # Don't send presence update for self
-        if event.get('user_id') == str(self.user.id):
+        # Don't send presence updates about ourselves; our own connection
+        # never receives them, but the user's other connections do
+        if event['user_id'] == self.user_id:
             return
 
-        await self.send(text_data=json.dumps({
-            'type': 'user_presence',
-            'user_id': event['user_id'],
-            'username': event['username'],
-            'status': event['status'],
-        }))
+        await self.send(text_data=event['payload'])
 
-    @database_sync_to_async
+    # Presence only touches the cache, so it runs in the thread pool rather
+    # than queueing behind ORM calls on the single thread-sensitive worker.
+    @sync_to_async(thread_sensitive=False)
     def set_user_online(self, user_id):
         """Mark user as online in Redis."""
-        cache.set(f'user_presence:{user_id}', True, settings.PRESENCE_EXPIRY)
+        presence.set_user_online(user_id)
 
-    @database_sync_to_async
+    @sync_to_async(thread_sensitive=False)
     def set_user_offline(self, user_id):
         """Mark user as offline in Redis."""
-        cache.delete(f'user_presence:{user_id}')
-
-    @database_sync_to_async
-    def update_user_last_seen(self, user_id):
-        """Update user's last seen timestamp."""
-        User.objects.filter(id=user_id).update(last_seen=timezone.now())
+        presence.set_user_offline(user_id)
 
     @database_sync_to_async
     def save_global_message(self, user_id, content):
         """Save global message to database and return it."""
-        user = User.objects.get(id=user_id)
         message = GlobalMessage.objects.create(
-            sender=user,
+            sender_id=user_id,
+            sender_username=self.user.username,
             content=content,
         )
         return {
@@ -207,14 +216,6 @@ class GlobalChatConsumer(AsyncWebsocketConsumer):
             'timestamp': message.timestamp.isoformat(),
         }
 
-    def sanitize_content(self, content):
-        """Sanitize message content to prevent XSS."""
-        return bleach.clean(
-            content,
-            tags=[],
-            strip=True,
-        )
-
 
 class PrivateChatConsumer(AsyncWebsocketConsumer):
     """
@@ -245,15 +246,15 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
         self.user = self.scope['user']
         self.group_name = f'user_{self.user.id}'
 
-        # Join personal inbox group
-        await self.channel_layer.group_add(
-            self.group_name,
-            self.channel_name
+        # Join personal inbox group and mark user as online concurrently
+        await asyncio.gather(
+            self.channel_layer.group_add(
+                self.group_name,
+                self.channel_name
+            ),
+            self.set_user_online(self.user.id),
         )
 
-        # Mark user as online
-        await self.set_user_online(self.user.id)
-
         # Accept the connection
         await self.accept()
 
@@ -265,17 +266,17 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
         them as offline.
         """
         if hasattr(self, 'user') and self.user and not self.user.is_anonymous:
-            # Leave personal inbox group
-            await self.channel_layer.group_discard(
-                self.group_name,
-                self.channel_name
+            # Leave personal inbox group and mark user as offline concurrently
+            await asyncio.gather(
+                self.channel_layer.group_discard(
+                    self.group_name,
+                    self.channel_name
+                ),
+                self.set_user_offline(self.user.id),
             )
 
-            # Mark user as offline
-            await self.set_user_offline(self.user.id)
-
-            # Update last seen
-            await self.update_user_last_seen(self.user.id)
+            # Queue last seen update; it is written in bulk shortly after
+            last_seen_buffer.add(self.user.id, timezone.now())
 
     async def receive(self, text_data):
         """
@@ -287,20 +288,34 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
 
             if message_type == 'send_private_message':
                 conversation_id = data.get('conversation_id')
                 content = data.get('content', '').strip()
 
-                if not conversation_id or not content:
+                # Drop empty messages and payloads far beyond the limit
+                # before any lookup
+                if (
+                    not conversation_id
+                    or not content
+                    or len(content) > settings.MESSAGE_MAX_LENGTH * 8
+                ):
                     return
 
-                # Sanitize and validate content
-                content = self.sanitize_content(content)
-                if len(content) > settings.MESSAGE_MAX_LENGTH:
-                    content = content[:settings.MESSAGE_MAX_LENGTH]
+                # Truncate before the model sanitizes the content on save
+                content = content[:settings.MESSAGE_MAX_LENGTH]
+
+                # Resolve the recipient first; this also checks that the
+                # sender belongs to the conversation.
+                recipient_id = await self.resolve_recipient(
+                    conversation_id,
+                    self.user.id
+                )
+                if not recipient_id:
+                    logger.debug('Recipient not found for conversation %s', conversation_id)
+                    return
 
                 # Save message and deliver to recipient
                 message = await self.send_private_message(
@@ -309,76 +324,50 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
                     content
                 )
 
-                # Get conversation to find recipient
-                conversation = await self.get_conversation(conversation_id)
-                if conversation:
-                    recipient_id = await self.get_recipient_id(
-                        conversation_id,
-                        self.user.id
-                    )
-
-                    if recipient_id:
-                        print(f"[DEBUG WS] Forwarding message to recipient: {recipient_id}")
-                        # Send to recipient's inbox
-                        await self.channel_layer.group_send(
-                            f'user_{recipient_id}',
-                            {
-                                'type': 'private_message',
-                                'message': message,
-                            }
-                        )
-
-                        # Confirm to sender
-                        await self.send(text_data=json.dumps({
-                            'type': 'private_message_sent',
+                logger.debug('Forwarding message to recipient: %s', recipient_id)
+                # Send to recipient's inbox
+                await self.channel_layer.group_send(
+                    f'user_{recipient_id}',
+                    {
+                        'type': 'private_message',
+                        'payload': orjson.dumps({
+                            'type': 'private_message',
                             'message': message,
-                        }))
-                    else:
-                        print(f"[DEBUG WS] Recipient not found for conversation {conversation_id}")
+                        }).decode(),
+                    }
+                )
 
-            elif message_type == 'typing_start':
-                conversation_id = data.get('conversation_id')
-                if conversation_id:
-                    conversation = await self.get_conversation(conversation_id)
-                    if conversation:
-                        recipient_id = await self.get_recipient_id(
-                            conversation_id,
-                            self.user.id
-                        )
-                        if recipient_id:
-                            await self.channel_layer.group_send(
-                                f'user_{recipient_id}',
-                                {
-                                    'type': 'typing_indicator',
-                                    'user_id': str(self.user.id),
-                                    'username': self.user.username,
-                                    'conversation_id': conversation_id,
-                                    'status': 'typing',
-                                }
-                            )
-
-            elif message_type == 'typing_stop':
+                # Confirm to sender
+                await self.send(text_data=orjson.dumps({
+                    'type': 'private_message_sent',
+                    'message': message,
+                }).decode())
+
+            elif message_type in ('typing_start', 'typing_stop'):
                 conversation_id = data.get('conversation_id')
-                if conversation_id:
-                    conversation = await self.get_conversation(conversation_id)
-                    if conversation:
-                        recipient_id = await self.get_recipient_id(
-                            conversation_id,
-                            self.user.id
-                        )
-                        if recipient_id:
-                            await self.channel_layer.group_send(
-                                f'user_{recipient_id}',
-                                {
-                                    'type': 'typing_indicator',
-                                    'user_id': str(self.user.id),
-                                    'username': self.user.username,
-                                    'conversation_id': conversation_id,
-                                    'status': 'stopped',
-                                }
-                            )
-
-        except json.JSONDecodeError:
+                if not conversation_id:
+                    return
+
+                recipient_id = await self.resolve_recipient(
+                    conversation_id,
+                    self.user.id
+                )
+                if recipient_id:
+                    await self.channel_layer.group_send(
+                        f'user_{recipient_id}',
+                        {
+                            'type': 'typing_indicator',
+                            'payload': orjson.dumps({
+                                'type': 'typing_indicator',
+                                'user_id': str(self.user.id),
+                                'username': self.user.username,
+                                'conversation_id': conversation_id,
+                                'status': 'typing' if message_type == 'typing_start' else 'stopped',
+                            }).decode(),
+                        }
+                    )
+
+        except orjson.JSONDecodeError:
             pass
 
     async def private_message(self, event):
@@ -387,10 +376,7 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
 
         This handler is called when a private message is sent to the user.
         """
-        await self.send(text_data=json.dumps({
-            'type': 'private_message',
-            'message': event['message'],
-        }))
+        await self.send(text_data=event['payload'])
 
     async def typing_indicator(self, event):
         """
@@ -398,77 +384,74 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
 
         This handler is called when a user starts or stops typing.
         """
-        await self.send(text_data=json.dumps({
-            'type': 'typing_indicator',
-            'user_id': event['user_id'],
-            'username': event['username'],
-            'conversation_id': event['conversation_id'],
-            'status': event['status'],
-        }))
+        await self.send(text_data=event['payload'])
 
-    @database_sync_to_async
+    # Presence only touches the cache, so it runs in the thread pool rather
+    # than queueing behind ORM calls on the single thread-sensitive worker.
+    @sync_to_async(thread_sensitive=False)
     def set_user_online(self, user_id):
         """Mark user as online in Redis."""
-        cache.set(f'user_presence:{user_id}', True, settings.PRESENCE_EXPIRY)
+        presence.set_user_online(user_id)
 
-    @database_sync_to_async
+    @sync_to_async(thread_sensitive=False)
     def set_user_offline(self, user_id):
         """Mark user as offline in Redis."""
-        cache.delete(f'user_presence:{user_id}')
+        presence.set_user_offline(user_id)
 
     @database_sync_to_async
-    def update_user_last_seen(self, user_id):
-        """Update user's last seen timestamp."""
-        User.objects.filter(id=user_id).update(last_seen=timezone.now())
+    def resolve_recipient(self, conversation_id, current_user_id):
+        """
+        Get the other participant's ID in a conversation.
 
-    @database_sync_to_async
-    def get_conversation(self, conversation_id):
-        """Get conversation by ID."""
-        try:
-            return Conversation.objects.get(id=conversation_id)
-        except Conversation.DoesNotExist:
-            return None
+        Participants come from ``Conversation.get_participant_ids``, which
+        serves them from the cache and only queries the database on a
+        miss. A recipient is only returned if the current user is a
+        participant.
 
-    @database_sync_to_async
-    def get_recipient_id(self, conversation_id, current_user_id):
-        """Get the other participant's ID in a conversation."""
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            other_user = conversation.participants.exclude(id=current_user_id).first()
-            return str(other_user.id) if other_user else None
-        except Conversation.DoesNotExist:
+        Args:
+            conversation_id: UUID of the conversation
+            current_user_id: UUID of the sending user
+
+        Returns:
+            str: The recipient's user ID, or None if the conversation
+            doesn't exist or the current user isn't a participant
+        """
+        participant_ids = Conversation.get_participant_ids(conversation_id)
+
+        current_user_id = str(current_user_id)
+        if current_user_id not in participant_ids:
             return None
 
+        for user_id in participant_ids:
+            if user_id != current_user_id:
+                return user_id
+        return None
+
     @database_sync_to_async
     def send_private_message(self, user_id, conversation_id, content):
-        """Save private message to database."""
-        user = User.objects.get(id=user_id)
-        conversation = Conversation.objects.get(id=conversation_id)
-
-        message = PrivateMessage.objects.create(
-            conversation=conversation,
-            sender=user,
-            content=content,
-        )
+        """
+        Save private message to database.
 
-        # Update conversation timestamp
-        conversation.save(update_fields=['updated_at'])
+        The message insert and the conversation update (done by a
+        ``post_save`` handler, see ``apps.chat.signals``) run in one
+        transaction, using foreign key IDs so neither the sender nor the
+        conversation has to be fetched first.
+        """
+        with transaction.atomic():
+            message = PrivateMessage.objects.create(
+                conversation_id=conversation_id,
+                sender_id=user_id,
+                sender_username=self.user.username,
+                content=content,
+            )
 
         return {
             'id': str(message.id),
             'conversation_id': str(conversation_id),
             'sender': {
-                'id': str(user.id),
-                'username': user.username,
+                'id': str(user_id),
+                'username': self.user.username,
             },
-            'content': content,
+            'content': message.content,
             'timestamp': message.timestamp.isoformat(),
         }
-
-    def sanitize_content(self, content):
-        """Sanitize message content to prevent XSS."""
-        return bleach.clean(
-            content,
-            tags=[],
-            strip=True,
-        )
@@ -6,15 +6,63 @@ WebSocket connections. It validates JWT tokens from the query string
 and associates the authenticated user with the WebSocket connection.
 """
 
-import jwt
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qs
+
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.state import token_backend
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+WS_USER_CACHE_TIMEOUT = 3600
+
+
+def ws_user_cache_key(user_id):
+    """Return the cache key holding the user data used by WebSockets."""
+    return f'ws_user:{user_id}'
+
+
+@dataclass(frozen=True)
+class WebSocketUser:
+    """
+    Read-only stand-in for the authenticated user of a WebSocket.
+
+    It holds only what the consumers read, so it can be rebuilt from the
+    cache without a query. Not being a model instance, it can't be saved
+    over the real user row with fields it never loaded.
+
+    Attributes:
+        id: UUID of the user
+        username: The user's username
+    """
+
+    id: object
+    username: str
+
+    is_anonymous = False
+    is_authenticated = True
+    is_active = True
+
+    @property
+    def pk(self):
+        """Return the user's primary key."""
+        return self.id
+
+    def __str__(self):
+        """Return the username."""
+        return self.username
+
 
 class JwtAuthMiddleware(BaseMiddleware):
     """
@@ -43,27 +91,17 @@ class JwtAuthMiddleware(BaseMiddleware):
             send: Callable to send messages to the client
         """
         # Get token from query string
-        query_string = scope.get('query_string', b'').decode()
-        token = None
-        
-        print(f"[DEBUG WS] Query String: {query_string}")
-
-        # Parse query parameters to find token
-        for param in query_string.split('&'):
-            if param.startswith('token='):
-                token = param.split('=')[1]
-                break
-        
-        print(f"[DEBUG WS] Token found: {token is not None}")
+        query = parse_qs(scope.get('query_string', b''))
+        token = query.get(b'token', [None])[0]
 
         # Authenticate user
         if token:
-            user = await self.get_user_from_token(token)
+            user = await self.get_user_from_token(token.decode())
             scope['user'] = user
-            print(f"[DEBUG WS] User resolved: {user}")
+            logger.debug('WebSocket user resolved: %s', user)
         else:
             scope['user'] = AnonymousUser()
-            print("[DEBUG WS] No token, using AnonymousUser")
+            logger.debug('WebSocket connection without token')
 
         return await super().__call__(scope, receive, send)
 
@@ -75,43 +113,83 @@ class JwtAuthMiddleware(BaseMiddleware):
             token: JWT access token string
 
         Returns:
-            User: The authenticated user object, or AnonymousUser if invalid
+            WebSocketUser: The authenticated user, or AnonymousUser if invalid
+        """
+        user = await self.resolve_user(token)
+        return user if user is not None else AnonymousUser()
+
+    @database_sync_to_async
+    def resolve_user(self, token):
+        """
+        Resolve a token to an active user, using the cache where possible.
+
+        A verified token's user ID is cached under a hash of the token until
+        the token expires, so reconnects with the same token skip decoding.
+        The user's username is cached under ``ws_user:<id>`` (invalidated on
+        save, see ``apps.chat.signals``), so reconnects also skip the user
+        query. Either way the user is returned as a WebSocketUser.
+
+        Args:
+            token: JWT access token string
+
+        Returns:
+            WebSocketUser: The active user, or None if the token is invalid
+            or the user doesn't exist or is inactive
         """
+        user_id = self.get_user_id(token)
+        if not user_id:
+            return None
+
+        cached = cache.get(ws_user_cache_key(user_id))
+        if cached is not None:
+            return WebSocketUser(id=User._meta.pk.to_python(user_id), **cached)
+
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=['HS256']
+            username = User.objects.values_list('username', flat=True).get(
+                id=user_id, is_active=True
             )
-            print(f"[DEBUG WS] Decoded payload: {payload}")
-            user_id = payload.get('user_id') or payload.get('id')
-            if user_id:
-                user = await self.get_user(user_id)
-                if user and user.is_active:
-                    return user
-        except jwt.ExpiredSignatureError:
-            pass
-        except jwt.InvalidTokenError:
-            pass
-
-        return AnonymousUser()
+        except (User.DoesNotExist, ValidationError):
+            return None
 
-    @database_sync_to_async
-    def get_user(self, user_id):
+        cache.set(
+            ws_user_cache_key(user_id),
+            {'username': username},
+            WS_USER_CACHE_TIMEOUT
+        )
+        return WebSocketUser(id=User._meta.pk.to_python(user_id), username=username)
+
+    def get_user_id(self, token):
         """
-        Fetch user from database asynchronously.
+        Get the user ID from a token, verifying it on a cache miss.
 
         Args:
-            user_id: UUID of the user to fetch
+            token: JWT access token string
 
         Returns:
-            User: The user object if found and active, None otherwise
+            str: The token's user ID, or None if the token is invalid
         """
+        key = f'ws_token:{hashlib.blake2b(token.encode(), digest_size=16).hexdigest()}'
+        user_id = cache.get(key)
+        if user_id is not None:
+            return user_id
+
         try:
-            return User.objects.get(id=user_id, is_active=True)
-        except User.DoesNotExist:
+            # Decode with the same backend (algorithm and prepared key) that
+            # issued the token for the REST API.
+            payload = token_backend.decode(token)
+        except TokenBackendError:
+            return None
+
+        user_id = payload.get('user_id') or payload.get('id')
+        if not user_id:
             return None
 
+        # Only remember the token for as long as it is valid.
+        ttl = int(payload['exp'] - time.time())
+        if ttl > 0:
+            cache.set(key, str(user_id), ttl)
+        return str(user_id)
+
 
 class JwtAuthMiddlewareStack:
     """
@@ -122,8 +200,9 @@ class JwtAuthMiddlewareStack:
     """
 
     def __init__(self, inner):
-        """Initialize the middleware stack."""
+        """Initialize the middleware stack, wrapping the inner app once."""
         self.inner = inner
+        self.middleware = JwtAuthMiddleware(inner)
 
     async def __call__(self, scope, receive, send):
         """
@@ -134,6 +213,4 @@ class JwtAuthMiddlewareStack:
             receive: Callable to receive messages
             send: Callable to send messages
         """
-        # Create middleware instance
-        middleware = JwtAuthMiddleware(self.inner)
-        return await middleware(scope, receive, send)
+        return await self.middleware(scope, receive, send)
@@ -0,0 +1,42 @@
+"""
+Trigram indexes backing admin search on message content.
+
+See ``authentication.0005_user_trigram_search_indexes``, which also
+installs the pg_trgm extension. PostgreSQL-only; other backends skip it.
+"""
+
+from django.db import migrations
+
+INDEXES = [
+    ('private_messages_content_trgm', 'private_messages', 'content'),
+    ('global_messages_content_trgm', 'global_messages', 'content'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+        ('authentication', '0005_user_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
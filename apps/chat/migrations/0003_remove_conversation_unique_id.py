@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-14 05:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_message_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='conversation',
+            name='unique_conversation_id',
+        ),
+    ]
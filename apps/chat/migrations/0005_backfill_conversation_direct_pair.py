@@ -0,0 +1,49 @@
+"""
+Fill user_low/user_high for existing two-person conversations.
+
+If an earlier race left several conversations for the same pair, only the
+most recently updated one gets the pair; the others keep NULLs, remain
+reachable through their participants, and no longer block the unique
+constraint.
+"""
+
+from django.db import migrations
+
+
+def backfill_direct_pairs(apps, schema_editor):
+    Conversation = apps.get_model('chat', 'Conversation')
+    Participant = Conversation.participants.through
+
+    participants = {}
+    for conversation_id, user_id in (
+        Participant.objects.values_list('conversation_id', 'user_id').iterator()
+    ):
+        participants.setdefault(conversation_id, []).append(user_id)
+
+    seen_pairs = set()
+    updates = []
+    for conversation in Conversation.objects.order_by('-updated_at').only('id').iterator():
+        user_ids = participants.get(conversation.id, [])
+        if len(user_ids) != 2:
+            continue
+
+        pair = tuple(sorted(user_ids))
+        if pair in seen_pairs:
+            continue
+        seen_pairs.add(pair)
+
+        conversation.user_low_id, conversation.user_high_id = pair
+        updates.append(conversation)
+
+    Conversation.objects.bulk_update(updates, ['user_low', 'user_high'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_conversation_direct_pair'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_direct_pairs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+"""
+Replace the global message timestamp B-tree with a BRIN index.
+
+BRIN indexes only exist on PostgreSQL; PortableBrinIndex creates a regular
+index under the same name on other backends.
+"""
+
+import apps.core.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_backfill_conversation_direct_pair'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='globalmessage',
+            name='global_mess_timesta_bbcdb7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='globalmessage',
+            index=apps.core.indexes.PortableBrinIndex(
+                fields=['timestamp'],
+                name='global_msg_timestamp_brin',
+                pages_per_range=32,
+            ),
+        ),
+    ]
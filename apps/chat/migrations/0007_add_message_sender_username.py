@@ -0,0 +1,40 @@
+"""
+Copy the sender's username onto private and global messages.
+
+Existing rows are filled from the users table with one UPDATE per message
+table.
+"""
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_sender_username(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    username = Subquery(
+        User.objects.filter(pk=OuterRef('sender_id')).values('username')[:1]
+    )
+    for model_name in ('PrivateMessage', 'GlobalMessage'):
+        apps.get_model('chat', model_name).objects.update(sender_username=username)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_user_trigram_search_indexes'),
+        ('chat', '0006_global_message_timestamp_brin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='globalmessage',
+            name='sender_username',
+            field=models.CharField(blank=True, editable=False, help_text="Sender's username, denormalized for display", max_length=150),
+        ),
+        migrations.AddField(
+            model_name='privatemessage',
+            name='sender_username',
+            field=models.CharField(blank=True, editable=False, help_text="Sender's username, denormalized for display", max_length=150),
+        ),
+        migrations.RunPython(backfill_sender_username, migrations.RunPython.noop),
+    ]
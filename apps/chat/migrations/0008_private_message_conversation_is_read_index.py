@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-14 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_add_message_sender_username'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='privatemessage',
+            index=models.Index(fields=['conversation', 'is_read'], name='private_mes_convers_299507_idx'),
+        ),
+    ]
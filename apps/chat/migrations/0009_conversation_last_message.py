@@ -0,0 +1,58 @@
+"""
+Store each conversation's last message on the conversation row.
+
+Existing conversations are filled from their newest message.
+"""
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_last_message(apps, schema_editor):
+    Conversation = apps.get_model('chat', 'Conversation')
+    PrivateMessage = apps.get_model('chat', 'PrivateMessage')
+
+    latest = PrivateMessage.objects.filter(
+        conversation_id=OuterRef('pk')
+    ).order_by('-timestamp')
+    conversations = Conversation.objects.annotate(
+        latest_at=Subquery(latest.values('timestamp')[:1]),
+        latest_content=Subquery(latest.values('content')[:1]),
+        latest_sender_id=Subquery(
+            latest.values('sender_id')[:1], output_field=models.UUIDField()
+        ),
+    ).filter(latest_at__isnull=False).only('id')
+
+    updates = []
+    for conversation in conversations.iterator():
+        conversation.last_message_at = conversation.latest_at
+        conversation.last_message_preview = {
+            'content': conversation.latest_content[:100],
+            'sender_id': str(conversation.latest_sender_id),
+        }
+        updates.append(conversation)
+
+    Conversation.objects.bulk_update(
+        updates, ['last_message_at', 'last_message_preview'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0008_private_message_conversation_is_read_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the last message was sent', null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.JSONField(blank=True, editable=False, help_text='Truncated content and sender ID of the last message', null=True),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+    ]
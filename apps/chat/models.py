@@ -9,8 +9,12 @@ global chat messages. All models use UUID for unique identification.
 import uuid
 from django.db import models
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
+from apps.core.indexes import PortableBrinIndex
+from .sanitizers import sanitize_content
+
 
 class Conversation(models.Model):
     """
@@ -22,8 +26,12 @@ class Conversation(models.Model):
     Attributes:
         id: UUID primary key for the conversation
         participants: Many-to-many relationship with User model
+        user_low: The direct conversation participant with the lower ID
+        user_high: The direct conversation participant with the higher ID
         created_at: Timestamp when the conversation was created
         updated_at: Timestamp of the last message in the conversation
+        last_message_at: When the last message was sent
+        last_message_preview: Truncated content and sender of the last message
     """
 
     id = models.UUIDField(
@@ -37,6 +45,22 @@ class Conversation(models.Model):
         related_name='conversations',
         help_text="Users participating in this conversation"
     )
+    user_low = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Participant with the lower ID in a direct conversation"
+    )
+    user_high = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Participant with the higher ID in a direct conversation"
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text="Timestamp when the conversation was created"
@@ -45,6 +69,18 @@ class Conversation(models.Model):
         auto_now=True,
         help_text="Timestamp of the last message in the conversation"
     )
+    last_message_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the last message was sent"
+    )
+    last_message_preview = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Truncated content and sender ID of the last message"
+    )
 
     class Meta:
         db_table = 'conversations'
@@ -52,9 +88,10 @@ class Conversation(models.Model):
         verbose_name_plural = 'Conversations'
         ordering = ['-updated_at']
         constraints = [
+            # One direct conversation per pair of users
             models.UniqueConstraint(
-                fields=['id'],
-                name='unique_conversation_id'
+                fields=['user_low', 'user_high'],
+                name='uniq_dm_pair'
             )
         ]
 
@@ -69,6 +106,97 @@ class Conversation(models.Model):
         """Get the other participant in a two-user conversation."""
         return self.participants.exclude(id=user.id).first()
 
+    @classmethod
+    def get_or_create_direct(cls, user, other_user):
+        """
+        Get or create the direct conversation between two users.
+
+        The pair is stored in canonical order (lower ID first) in
+        ``user_low``/``user_high``, so the lookup is a single probe of the
+        ``uniq_dm_pair`` index, and concurrent creation can't produce two
+        conversations for the same pair.
+
+        Args:
+            user: One participant
+            other_user: The other participant
+
+        Returns:
+            tuple: (conversation, created)
+        """
+        user_low, user_high = sorted([user, other_user], key=lambda u: u.pk)
+        conversation, created = cls.objects.get_or_create(
+            user_low=user_low,
+            user_high=user_high,
+        )
+        if created:
+            conversation.participants.add(user_low, user_high)
+        return conversation, created
+
+    @staticmethod
+    def build_last_message_preview(message):
+        """Return the preview stored for a conversation's last message."""
+        return {
+            'content': message.content[:100],
+            'sender_id': str(message.sender_id),
+        }
+
+    @staticmethod
+    def participants_cache_key(conversation_id):
+        """
+        Return the cache key holding a conversation's participant IDs.
+
+        The ID is normalized first, so every spelling of a UUID (upper
+        case, without dashes, ...) maps to the one key that signals
+        invalidate.
+
+        Args:
+            conversation_id: UUID of the conversation, or its string form
+
+        Returns:
+            str: Cache key for the conversation
+
+        Raises:
+            ValueError: If the ID is not a valid UUID
+        """
+        return f'conv_participants:{uuid.UUID(str(conversation_id))}'
+
+    @classmethod
+    def get_participant_ids(cls, conversation_id):
+        """
+        Get the IDs of a conversation's participants, using the cache.
+
+        On a cache miss the IDs are read from the M2M table in a single
+        query. The cache entry is invalidated when participants change or
+        the conversation is deleted (see ``apps.chat.signals``).
+
+        Args:
+            conversation_id: UUID of the conversation
+
+        Returns:
+            list: Participant user IDs as strings; empty if the
+            conversation doesn't exist or the ID is malformed
+        """
+        try:
+            key = cls.participants_cache_key(conversation_id)
+        except ValueError:
+            # Malformed conversation ID
+            return []
+
+        participant_ids = cache.get(key)
+        if participant_ids is not None:
+            return participant_ids
+
+        participant_ids = [
+            str(user_id) for user_id in
+            cls.participants.through.objects
+            .filter(conversation_id=conversation_id)
+            .values_list('user_id', flat=True)
+        ]
+
+        if participant_ids:
+            cache.set(key, participant_ids, 3600)
+        return participant_ids
+
 
 class PrivateMessage(models.Model):
     """
@@ -81,6 +209,7 @@ class PrivateMessage(models.Model):
         id: UUID primary key for the message
         conversation: Foreign key to the Conversation model
         sender: Foreign key to the User model
+        sender_username: Sender's username, copied at insert
         content: Text content of the message
         timestamp: When the message was sent
         is_read: Whether the message has been read by the recipient
@@ -104,6 +233,12 @@ class PrivateMessage(models.Model):
         related_name='sent_messages',
         help_text="User who sent the message"
     )
+    sender_username = models.CharField(
+        max_length=150,
+        blank=True,
+        editable=False,
+        help_text="Sender's username, denormalized for display"
+    )
     content = models.TextField(
         max_length=2000,
         help_text="Message content (max 2000 characters)"
@@ -125,20 +260,36 @@ class PrivateMessage(models.Model):
         indexes = [
             models.Index(fields=['conversation', 'timestamp']),
             models.Index(fields=['sender', 'timestamp']),
+            models.Index(fields=['conversation', 'is_read']),
         ]
 
     def __str__(self):
         """Return string representation of the message."""
         return f"Message from {self.sender.username} at {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the message, sanitizing its content when it is created.
+
+        Content is sanitized exactly once, on write, so stored content is
+        always safe and read paths never need to clean it again. The
+        sender's username is copied onto the row unless the caller already
+        set it, so displaying the message needs no join.
+        """
+        if self._state.adding:
+            self.content = sanitize_content(self.content)
+            if not self.sender_username:
+                self.sender_username = self.sender.username
+        super().save(*args, **kwargs)
+
     def to_dict(self):
         """Convert message to dictionary for JSON serialization."""
         return {
             'id': str(self.id),
             'conversation_id': str(self.conversation_id),
             'sender': {
-                'id': str(self.sender.id),
-                'username': self.sender.username,
+                'id': str(self.sender_id),
+                'username': self.sender_username,
             },
             'content': self.content,
             'timestamp': self.timestamp.isoformat(),
@@ -156,6 +307,7 @@ class GlobalMessage(models.Model):
     Attributes:
         id: Auto-increment primary key for performance
         sender: Foreign key to the User model
+        sender_username: Sender's username, copied at insert
         content: Text content of the message
         timestamp: When the message was sent
     """
@@ -170,6 +322,12 @@ class GlobalMessage(models.Model):
         related_name='global_messages',
         help_text="User who sent the message"
     )
+    sender_username = models.CharField(
+        max_length=150,
+        blank=True,
+        editable=False,
+        help_text="Sender's username, denormalized for display"
+    )
     content = models.TextField(
         max_length=2000,
         help_text="Message content (max 2000 characters)"
@@ -185,20 +343,42 @@ class GlobalMessage(models.Model):
         verbose_name_plural = 'Global Messages'
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['-timestamp']),
+            # Rows are appended in timestamp order, so a BRIN index serves
+            # time range scans at a fraction of a B-tree's size. Other
+            # backends get a plain index.
+            PortableBrinIndex(
+                fields=['timestamp'],
+                name='global_msg_timestamp_brin',
+                pages_per_range=32
+            ),
         ]
 
     def __str__(self):
         """Return string representation of the message."""
         return f"Global message from {self.sender.username} at {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the message, sanitizing its content when it is created.
+
+        Content is sanitized exactly once, on write, so stored content is
+        always safe and read paths never need to clean it again. The
+        sender's username is copied onto the row unless the caller already
+        set it, so displaying the message needs no join.
+        """
+        if self._state.adding:
+            self.content = sanitize_content(self.content)
+            if not self.sender_username:
+                self.sender_username = self.sender.username
+        super().save(*args, **kwargs)
+
     def to_dict(self):
         """Convert message to dictionary for JSON serialization."""
         return {
             'id': self.id,
             'sender': {
-                'id': str(self.sender.id),
-                'username': self.sender.username,
+                'id': str(self.sender_id),
+                'username': self.sender_username,
             },
             'content': self.content,
             'timestamp': self.timestamp.isoformat(),
@@ -7,9 +7,18 @@ which users are currently connected to the application.
 """
 
 import asyncio
+import time
+
+import orjson
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.cache import cache
 
+from apps.core.cache import get_redis_client
+
+# Monotonic time of each user's last presence refresh in this process
+_last_refresh = {}
+
 
 def set_user_online(user_id):
     """
@@ -25,11 +34,22 @@ def set_user_online(user_id):
         bool: True if successful, False otherwise
     """
     try:
-        cache.set(
-            f'user_presence:{user_id}',
-            True,
-            settings.PRESENCE_EXPIRY
-        )
+        client = get_redis_client()
+        if client is not None:
+            # Write a bare b'1' with SETEX instead of a pickled True.
+            # Django's Redis cache reads integer values back without
+            # unpickling.
+            client.set(
+                cache.make_key(f'user_presence:{user_id}'),
+                b'1',
+                ex=settings.PRESENCE_EXPIRY
+            )
+        else:
+            cache.set(
+                f'user_presence:{user_id}',
+                True,
+                settings.PRESENCE_EXPIRY
+            )
         return True
     except Exception:
         return False
@@ -48,6 +68,7 @@ def set_user_offline(user_id):
     Returns:
         bool: True if successful, False otherwise
     """
+    _last_refresh.pop(user_id, None)
     try:
         cache.delete(f'user_presence:{user_id}')
         return True
@@ -69,6 +90,10 @@ def is_user_online(user_id):
         bool: True if the user is online, False otherwise
     """
     try:
+        client = get_redis_client()
+        if client is not None:
+            # EXISTS answers without transferring or decoding the value
+            return bool(client.exists(cache.make_key(f'user_presence:{user_id}')))
         return cache.get(f'user_presence:{user_id}') is not None
     except Exception:
         return False
@@ -79,7 +104,7 @@ def get_online_users(user_ids):
     Check online status for multiple users.
 
     This function efficiently checks the online status of multiple users
-    using Redis's mget functionality.
+    with a single Redis MGET.
 
     Args:
         user_ids: List of user UUIDs to check
@@ -87,16 +112,30 @@ def get_online_users(user_ids):
     Returns:
         dict: Mapping of user_id to online status (bool)
     """
+    if not user_ids:
+        return {}
+
     try:
-        keys = [f'user_presence:{uid}' for uid in user_ids]
+        client = get_redis_client()
+        if client is not None:
+            # Read the raw values: only their presence matters, so there
+            # is nothing to unpickle. EXISTS can't be used here, since with
+            # several keys it returns a single count.
+            # The cache prefix and version come first in a made key, so
+            # it is computed once and each key is a single concatenation.
+            prefix = cache.make_key('user_presence:')
+            values = client.mget([prefix + str(uid) for uid in user_ids])
+            return {
+                user_id: value is not None
+                for user_id, value in zip(user_ids, values)
+            }
+
+        keys = ['user_presence:' + str(uid) for uid in user_ids]
         values = cache.get_many(keys)
-
-        online_status = {}
-        for user_id in user_ids:
-            key = f'user_presence:{user_id}'
-            online_status[user_id] = key in values and values[key] is True
-
-        return online_status
+        return {
+            user_id: key in values
+            for user_id, key in zip(user_ids, keys)
+        }
     except Exception:
         # Return all as offline on error
         return {uid: False for uid in user_ids}
@@ -107,7 +146,9 @@ def refresh_user_presence(user_id):
     Refresh a user's presence TTL.
 
     This function extends the TTL of a user's presence key, effectively
-    acting as a heartbeat to keep the user marked as online.
+    acting as a heartbeat to keep the user marked as online. Refreshes
+    within a third of the TTL of the previous one are skipped, and on
+    Redis the TTL is extended with EXPIRE rather than rewriting the key.
 
     Args:
         user_id: UUID of the user
@@ -115,8 +156,21 @@ def refresh_user_presence(user_id):
     Returns:
         bool: True if successful, False otherwise
     """
+    now = time.monotonic()
+    if now - _last_refresh.get(user_id, 0) < settings.PRESENCE_EXPIRY / 3:
+        return True
+
     try:
-        return set_user_online(user_id)
+        client = get_redis_client()
+        # EXPIRE fails if the key has already expired; write it again then
+        if client is None or not client.expire(
+            cache.make_key(f'user_presence:{user_id}'),
+            settings.PRESENCE_EXPIRY
+        ):
+            if not set_user_online(user_id):
+                return False
+        _last_refresh[user_id] = now
+        return True
     except Exception:
         return False
 
@@ -133,16 +187,22 @@ async def async_set_user_online(user_id, channel_layer, channel_name):
         channel_layer: Django Channels layer
         channel_name: Channel name to broadcast from
     """
-    set_user_online(user_id)
-
-    # Broadcast presence update
-    await channel_layer.group_send(
-        'global_chat',
-        {
-            'type': 'user_presence',
-            'user_id': str(user_id),
-            'status': 'online',
-        }
+    # Update the presence key off the event loop and broadcast the
+    # change concurrently
+    await asyncio.gather(
+        sync_to_async(set_user_online, thread_sensitive=False)(user_id),
+        channel_layer.group_send(
+            'global_chat',
+            {
+                'type': 'user_presence',
+                'user_id': str(user_id),
+                'payload': orjson.dumps({
+                    'type': 'user_presence',
+                    'user_id': str(user_id),
+                    'status': 'online',
+                }).decode(),
+            }
+        ),
     )
 
 
@@ -158,14 +218,20 @@ async def async_set_user_offline(user_id, channel_layer, channel_name):
         channel_layer: Django Channels layer
         channel_name: Channel name to broadcast from
     """
-    set_user_offline(user_id)
-
-    # Broadcast presence update
-    await channel_layer.group_send(
-        'global_chat',
-        {
-            'type': 'user_presence',
-            'user_id': str(user_id),
-            'status': 'offline',
-        }
+    # Update the presence key off the event loop and broadcast the
+    # change concurrently
+    await asyncio.gather(
+        sync_to_async(set_user_offline, thread_sensitive=False)(user_id),
+        channel_layer.group_send(
+            'global_chat',
+            {
+                'type': 'user_presence',
+                'user_id': str(user_id),
+                'payload': orjson.dumps({
+                    'type': 'user_presence',
+                    'user_id': str(user_id),
+                    'status': 'offline',
+                }).decode(),
+            }
+        ),
     )
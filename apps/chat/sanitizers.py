@@ -0,0 +1,45 @@
+"""
+Message content sanitization.
+
+Chat messages are plain text. This module strips any HTML from user
+input before it is stored or broadcast, using nh3 (Python bindings for
+the Rust ammonia sanitizer).
+"""
+
+import re
+
+import nh3
+
+# No markup is allowed in chat messages.
+ALLOWED_TAGS = frozenset()
+ALLOWED_ATTRIBUTES = {}
+
+# Characters nh3 would change: markup and entity metacharacters, plus NUL
+# and carriage return (normalized by the HTML parser) and no-break space
+# (written back as &nbsp;).
+# Text without any of them comes back from nh3 unchanged.
+_NEEDS_CLEANING = re.compile('[<>&\x00\r\xa0]')
+
+# Built once: nh3.clean() constructs a new ammonia cleaner on every call.
+_CLEANER = nh3.Cleaner(
+    tags=ALLOWED_TAGS,
+    attributes=ALLOWED_ATTRIBUTES,
+    strip_comments=True,
+)
+
+
+def sanitize_content(content):
+    """
+    Sanitize message content to prevent XSS.
+
+    Args:
+        content: Raw message text from the client
+
+    Returns:
+        str: The text with all HTML tags and comments removed
+    """
+    # Most messages are plain text; skip the HTML parser for them.
+    if not _NEEDS_CLEANING.search(content):
+        return content
+
+    return _CLEANER.clean(content)
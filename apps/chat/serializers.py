@@ -7,6 +7,7 @@ These serializers handle data validation and transformation for REST API endpoin
 
 from rest_framework import serializers
 
+from apps.authentication.models import User
 from apps.authentication.serializers import UserSerializer
 from .models import Conversation, PrivateMessage, GlobalMessage
 
@@ -37,17 +38,26 @@ class ConversationSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Get the last message in the conversation."""
-        last_msg = obj.messages.order_by('-timestamp').first()
-        if last_msg:
-            return {
-                'content': last_msg.content[:100],
-                'timestamp': last_msg.timestamp.isoformat(),
-                'sender_id': str(last_msg.sender_id),
-            }
-        return None
+        if obj.last_message_preview is None:
+            return None
+        return {
+            **obj.last_message_preview,
+            'timestamp': obj.last_message_at.isoformat(),
+        }
 
     def get_unread_count(self, obj):
-        """Get count of unread messages for the current user."""
+        """
+        Get count of unread messages for the current user.
+
+        Uses the ``unread_count`` annotation when the queryset provides it,
+        otherwise counts with a query.
+        """
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count
+        if obj.last_message_at is None:
+            # No messages yet
+            return 0
+
         request = self.context.get('request')
         if request and request.user:
             return obj.messages.filter(
@@ -58,6 +68,32 @@ class ConversationSerializer(serializers.ModelSerializer):
         return 0
 
 
+class ParticipantSerializer(UserSerializer):
+    """
+    Compact user representation for conversation lists.
+
+    Carries only what the conversation list displays. Its cards are
+    rendered directly rather than cached, as they're cheaper to build than
+    to fetch.
+    """
+
+    cache_cards = False
+
+    class Meta(UserSerializer.Meta):
+        fields = ['id', 'username', 'is_online']
+        read_only_fields = ['id']
+
+
+class ConversationListSerializer(ConversationSerializer):
+    """
+    Serializer for conversation list entries.
+
+    Same as ConversationSerializer, with compact participants.
+    """
+
+    participants = ParticipantSerializer(many=True, read_only=True)
+
+
 class ConversationCreateSerializer(serializers.Serializer):
     """
     Serializer for creating or getting a conversation.
@@ -72,7 +108,6 @@ class ConversationCreateSerializer(serializers.Serializer):
 
     def validate_user_id(self, value):
         """Validate that the user exists."""
-        from apps.authentication.models import User
         try:
             User.objects.get(id=value, is_active=True)
         except User.DoesNotExist:
@@ -81,23 +116,15 @@ class ConversationCreateSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         """Create or get existing conversation."""
-        from apps.authentication.models import User
         user_id = validated_data['user_id']
         current_user = self.context['request'].user
 
         other_user = User.objects.get(id=user_id)
 
-        # Check if conversation already exists
-        conversation = Conversation.objects.filter(
-            participants=current_user
-        ).filter(
-            participants=other_user
-        ).first()
-
-        if not conversation:
-            conversation = Conversation.objects.create()
-            conversation.participants.add(current_user, other_user)
-
+        conversation, _ = Conversation.get_or_create_direct(
+            current_user,
+            other_user
+        )
         return conversation
 
 
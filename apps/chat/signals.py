@@ -0,0 +1,145 @@
+"""
+Signal handlers for the chat app.
+
+This module keeps cached conversation data and denormalized message
+fields in sync with the database.
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.authentication.models import User
+from .middleware import ws_user_cache_key
+from .models import Conversation, GlobalMessage, PrivateMessage
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def invalidate_participants_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drop cached participant IDs when a conversation's participants change.
+
+    Handles both directions of the relation: ``conversation.participants``
+    (instance is a Conversation) and ``user.conversations`` (instance is a
+    User, and ``pk_set`` holds conversation IDs).
+
+    Args:
+        sender: The participants through model
+        instance: The Conversation or User being modified
+        action: The m2m_changed action name
+        reverse: True if the change was made from the User side
+        pk_set: Primary keys added or removed, None for clears
+        **kwargs: Additional signal arguments
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            cache.delete(Conversation.participants_cache_key(instance.pk))
+        return
+
+    if action in ('post_add', 'post_remove'):
+        conversation_ids = pk_set
+    elif action == 'pre_clear':
+        # The affected conversations are only known before the clear.
+        conversation_ids = instance.conversations.values_list('pk', flat=True)
+    else:
+        return
+
+    cache.delete_many([
+        Conversation.participants_cache_key(conversation_id)
+        for conversation_id in conversation_ids
+    ])
+
+
+@receiver(post_delete, sender=Conversation)
+def invalidate_participants_on_delete(sender, instance, **kwargs):
+    """
+    Drop cached participant IDs for a deleted conversation.
+
+    Args:
+        sender: The Conversation model class
+        instance: The deleted Conversation instance
+        **kwargs: Additional signal arguments
+    """
+    cache.delete(Conversation.participants_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=PrivateMessage)
+def update_conversation_on_message(sender, instance, created, **kwargs):
+    """
+    Record a new message as its conversation's last message.
+
+    One UPDATE bumps ``updated_at`` and stores the denormalized last
+    message, so listing conversations never has to query messages. It runs
+    inside the caller's transaction, if any.
+
+    Args:
+        sender: The PrivateMessage model class
+        instance: The saved PrivateMessage instance
+        created: True if the message was just created
+        **kwargs: Additional signal arguments
+    """
+    if not created:
+        return
+
+    Conversation.objects.filter(id=instance.conversation_id).update(
+        updated_at=instance.timestamp,
+        last_message_at=instance.timestamp,
+        last_message_preview=Conversation.build_last_message_preview(instance),
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_ws_user_on_save(sender, instance, **kwargs):
+    """
+    Drop the cached WebSocket user data when a user is saved.
+
+    This covers username changes and deactivation; the next connection
+    reloads the user from the database.
+
+    Args:
+        sender: The User model class
+        instance: The saved User instance
+        **kwargs: Additional signal arguments
+    """
+    cache.delete(ws_user_cache_key(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_ws_user_on_delete(sender, instance, **kwargs):
+    """
+    Drop the cached WebSocket user data when a user is deleted.
+
+    Without this, a deleted user's unexpired token would keep resolving
+    from the cache instead of being rejected.
+
+    Args:
+        sender: The User model class
+        instance: The deleted User instance
+        **kwargs: Additional signal arguments
+    """
+    cache.delete(ws_user_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def sync_sender_username_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Rewrite the denormalized sender username after a username change.
+
+    Saves that can't touch the username (new users, or ``update_fields``
+    without it) are skipped. Otherwise only rows still holding a stale
+    username are updated, so a save without a rename writes nothing.
+
+    Args:
+        sender: The User model class
+        instance: The saved User instance
+        created: True if the user was just created
+        update_fields: Fields passed to save(), or None for all fields
+        **kwargs: Additional signal arguments
+    """
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+
+    for model in (PrivateMessage, GlobalMessage):
+        model.objects.filter(sender_id=instance.pk).exclude(
+            sender_username=instance.username
+        ).update(sender_username=instance.username)
@@ -1,9 +1,23 @@
 """
 Tests for chat app.
 """
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.chat.batching import LastSeenBuffer
+from apps.chat.middleware import JwtAuthMiddleware
 from apps.chat.models import GlobalMessage, Conversation, PrivateMessage
+from apps.chat.presence import get_online_users
+from apps.chat.sanitizers import sanitize_content
 
 User = get_user_model()
 
@@ -29,6 +43,28 @@ class GlobalMessageTest(TestCase):
         self.assertEqual(message.content, 'Test message')
         self.assertIsNotNone(message.timestamp)
 
+    def test_content_sanitized_on_create(self):
+        """Test that markup is stripped when the message is created."""
+        message = GlobalMessage.objects.create(
+            sender=self.user,
+            content='<script>alert(1)</script>Hello <b>world</b>'
+        )
+        message.refresh_from_db()
+        self.assertEqual(message.content, 'Hello world')
+
+    def test_sender_username_follows_rename(self):
+        """Test that the copied sender username is kept up to date."""
+        message = GlobalMessage.objects.create(
+            sender=self.user,
+            content='Test message'
+        )
+        self.assertEqual(message.to_dict()['sender']['username'], 'testuser')
+
+        self.user.username = 'renamed'
+        self.user.save()
+        message.refresh_from_db()
+        self.assertEqual(message.sender_username, 'renamed')
+
 
 class ConversationTest(TestCase):
     """Test Conversation model."""
@@ -55,6 +91,44 @@ class ConversationTest(TestCase):
         self.assertIn(self.user1, conversation.participants.all())
         self.assertIn(self.user2, conversation.participants.all())
 
+    def test_get_or_create_direct_is_order_independent(self):
+        """Test that both users resolve to the same direct conversation."""
+        conversation, created = Conversation.get_or_create_direct(self.user1, self.user2)
+        same, created_again = Conversation.get_or_create_direct(self.user2, self.user1)
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(conversation, same)
+        self.assertEqual(conversation.participants.count(), 2)
+
+    def test_participant_ids_cache_follows_changes(self):
+        """Test that cached participant IDs are refreshed on changes."""
+        conversation = Conversation.objects.create()
+        conversation.participants.add(self.user1)
+        self.assertEqual(
+            Conversation.get_participant_ids(conversation.id),
+            [str(self.user1.id)]
+        )
+
+        self.user2.conversations.add(conversation)
+
+        self.assertCountEqual(
+            Conversation.get_participant_ids(conversation.id),
+            [str(self.user1.id), str(self.user2.id)]
+        )
+
+    def test_participant_ids_cache_ignores_id_spelling(self):
+        """Test that any spelling of the ID shares one invalidated entry."""
+        conversation = Conversation.objects.create()
+        conversation.participants.add(self.user1)
+        spelling = conversation.id.hex.upper()
+        Conversation.get_participant_ids(spelling)
+
+        conversation.participants.remove(self.user1)
+
+        self.assertEqual(Conversation.get_participant_ids(spelling), [])
+        self.assertEqual(Conversation.get_participant_ids('not-a-uuid'), [])
+
 
 class PrivateMessageTest(TestCase):
     """Test PrivateMessage model."""
@@ -85,3 +159,282 @@ class PrivateMessageTest(TestCase):
         self.assertEqual(message.conversation, self.conversation)
         self.assertEqual(message.content, 'Private test message')
         self.assertFalse(message.is_read)
+
+
+class ConversationListViewTest(APITestCase):
+    """Test the conversation list endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            email='viewer@example.com',
+            username='viewer',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        """Clear cached user cards written by the tests."""
+        cache.clear()
+
+    def add_conversation(self, index):
+        """Create a conversation with one read and one unread message."""
+        other = User.objects.create_user(
+            email=f'other{index}@example.com',
+            username=f'other{index}',
+            password='testpass123'
+        )
+        conversation, _ = Conversation.get_or_create_direct(self.user, other)
+        PrivateMessage.objects.create(
+            conversation=conversation, sender=self.user, content='Hi'
+        )
+        PrivateMessage.objects.create(
+            conversation=conversation, sender=other, content=f'Reply {index}'
+        )
+        return conversation
+
+    def test_query_count_is_independent_of_size(self):
+        """Test that listing more conversations doesn't add queries."""
+        self.add_conversation(0)
+        with self.assertNumQueries(3):
+            self.client.get('/api/chat/conversations/')
+
+        for index in range(1, 4):
+            self.add_conversation(index)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/chat/conversations/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['last_message']['content'], 'Reply 3')
+        self.assertTrue(all(c['unread_count'] == 1 for c in results))
+        self.assertEqual(
+            set(results[0]['participants'][0]), {'id', 'username', 'is_online'}
+        )
+
+    def test_shared_participant_is_rendered_once(self):
+        """Test that the viewer is serialized once for the whole list."""
+        for index in range(3):
+            self.add_conversation(index)
+
+        with mock.patch(
+            'apps.authentication.serializers.get_online_users',
+            wraps=get_online_users
+        ) as presence:
+            response = self.client.get('/api/chat/conversations/')
+
+        looked_up = [
+            user_id for call in presence.call_args_list for user_id in call.args[0]
+        ]
+        self.assertEqual(looked_up.count(self.user.id), 1)
+        viewer = [
+            participant
+            for conversation in response.data['results']
+            for participant in conversation['participants']
+            if participant['username'] == 'viewer'
+        ]
+        self.assertEqual(len(viewer), 3)
+
+
+class GlobalMessageHistoryViewTest(APITestCase):
+    """Test the global message history endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            email='reader@example.com',
+            username='reader',
+            password='testpass123'
+        )
+        for index in range(5):
+            GlobalMessage.objects.create(sender=self.user, content=f'Message {index}')
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        """Clear cached user cards written by the tests."""
+        cache.clear()
+
+    def test_returns_latest_messages_oldest_first(self):
+        """Test that the limit keeps the newest messages in chronological order."""
+        response = self.client.get('/api/chat/global/messages/?limit=3')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [message['content'] for message in response.data],
+            ['Message 2', 'Message 3', 'Message 4']
+        )
+
+
+class MarkMessagesReadViewTest(APITestCase):
+    """Test the mark messages read endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='reader',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='writer',
+            password='testpass123'
+        )
+        self.conversation, _ = Conversation.get_or_create_direct(self.user, self.other)
+        self.message = PrivateMessage.objects.create(
+            conversation=self.conversation, sender=self.other, content='Hi'
+        )
+        self.url = f'/api/chat/conversations/{self.conversation.id}/read/'
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        """Clear cached data written by the tests."""
+        cache.clear()
+
+    def test_marks_messages_read(self):
+        """Test that a participant's unread messages are updated."""
+        response = self.client.post(
+            self.url, {'message_ids': [str(self.message.id)]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+        self.message.refresh_from_db()
+        self.assertTrue(self.message.is_read)
+
+    def test_non_participant_gets_404(self):
+        """Test that another user's conversation is not found."""
+        outsider = User.objects.create_user(
+            username='outsider',
+            password='testpass123'
+        )
+        self.client.force_authenticate(outsider)
+
+        response = self.client.post(
+            self.url, {'message_ids': [str(self.message.id)]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.message.refresh_from_db()
+        self.assertFalse(self.message.is_read)
+
+    def test_malformed_ids_are_rejected(self):
+        """Test that message IDs that aren't UUIDs are a validation error."""
+        response = self.client.post(
+            self.url, {'message_ids': ['not-a-uuid']}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LastSeenBufferTest(TestCase):
+    """Test the coalescing last_seen buffer."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='buffered',
+            password='testpass123'
+        )
+
+    def test_flush_writes_latest_timestamp(self):
+        """Test that only the most recent timestamp per user is written."""
+        buffer = LastSeenBuffer(interval=60)
+        later = timezone.now()
+        earlier = later - timedelta(minutes=5)
+
+        async def record_and_flush():
+            buffer.add(self.user.id, earlier)
+            buffer.add(self.user.id, later)
+            await buffer.flush()
+
+        async_to_sync(record_and_flush)()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_seen, later)
+
+    def test_flush_keeps_newer_stored_timestamp(self):
+        """Test that a flush doesn't overwrite a more recent last_seen."""
+        buffer = LastSeenBuffer(interval=60)
+        newer = timezone.now()
+        User.objects.filter(pk=self.user.pk).update(last_seen=newer)
+
+        async def record_and_flush():
+            buffer.add(self.user.id, newer - timedelta(minutes=5))
+            await buffer.flush()
+
+        async_to_sync(record_and_flush)()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_seen, newer)
+
+
+class SanitizeContentTest(TestCase):
+    """Test message content sanitization."""
+
+    def test_strips_markup(self):
+        """Test that tags and comments are removed and text is escaped."""
+        self.assertEqual(
+            sanitize_content('<b>hi</b> & <!-- note --><img src=x onerror=alert(1)>'),
+            'hi &amp; '
+        )
+
+    def test_plain_text_is_unchanged(self):
+        """Test that text without markup passes through as is."""
+        text = 'it\'s "fine" 😀'
+        self.assertIs(sanitize_content(text), text)
+
+
+class JwtAuthMiddlewareTest(TestCase):
+    """Test WebSocket token authentication."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='socket',
+            password='testpass123'
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.middleware = JwtAuthMiddleware(None)
+
+    def tearDown(self):
+        """Clear cached tokens and users."""
+        cache.clear()
+
+    def test_reconnect_is_served_from_cache(self):
+        """Test that a repeated token needs no database queries."""
+        first = async_to_sync(self.middleware.get_user_from_token)(self.token)
+
+        with self.assertNumQueries(0):
+            second = async_to_sync(self.middleware.get_user_from_token)(self.token)
+
+        self.assertEqual(first.id, self.user.id)
+        self.assertEqual(second.id, self.user.id)
+        self.assertEqual(second.username, 'socket')
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivating a user invalidates the cached user."""
+        async_to_sync(self.middleware.get_user_from_token)(self.token)
+
+        self.user.is_active = False
+        self.user.save()
+
+        user = async_to_sync(self.middleware.get_user_from_token)(self.token)
+        self.assertTrue(user.is_anonymous)
+
+    def test_deleted_user_is_rejected(self):
+        """Test that deleting a user invalidates the cached user."""
+        async_to_sync(self.middleware.get_user_from_token)(self.token)
+
+        self.user.delete()
+
+        user = async_to_sync(self.middleware.get_user_from_token)(self.token)
+        self.assertIsInstance(user, AnonymousUser)
+
+    def test_cached_user_is_read_only(self):
+        """Test that the cached stand-in can't be saved over the user row."""
+        async_to_sync(self.middleware.get_user_from_token)(self.token)
+        user = async_to_sync(self.middleware.get_user_from_token)(self.token)
+
+        self.assertFalse(hasattr(user, 'save'))
+        with self.assertRaises(AttributeError):
+            user.username = ''
@@ -5,26 +5,93 @@ This module provides REST API views for conversations and message management.
 These views handle CRUD operations for conversations and message history retrieval.
 """
 
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status, generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.authentication.models import User
 from .models import Conversation, PrivateMessage, GlobalMessage
 from .serializers import (
     ConversationSerializer,
+    ConversationListSerializer,
     ConversationCreateSerializer,
+    MessageMarkReadSerializer,
     PrivateMessageSerializer,
     GlobalMessageSerializer,
 )
 from django.shortcuts import render
 
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 200
+
+# Columns read when serializing messages, including the nested sender
+SENDER_FIELDS = ('sender__id', 'sender__username', 'sender__created_at', 'sender__last_seen')
+PRIVATE_MESSAGE_FIELDS = (
+    'id', 'conversation', 'sender', 'content', 'timestamp', 'is_read', *SENDER_FIELDS
+)
+GLOBAL_MESSAGE_FIELDS = ('id', 'sender', 'content', 'timestamp', *SENDER_FIELDS)
+
+
 def index(request):
     """Render the main chat application."""
     return render(request, 'chat/index.html')
 
 
+def get_history_window(request):
+    """
+    Parse the ``limit`` and ``before`` query parameters of a history view.
+
+    Args:
+        request: The DRF request
+
+    Returns:
+        tuple: (limit, before), where limit is clamped to
+        1..HISTORY_MAX_LIMIT and before is an aware datetime or None;
+        malformed values fall back to the defaults
+    """
+    try:
+        limit = int(request.query_params.get('limit', HISTORY_DEFAULT_LIMIT))
+    except ValueError:
+        limit = HISTORY_DEFAULT_LIMIT
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+
+    try:
+        before = parse_datetime(request.query_params.get('before', ''))
+    except ValueError:
+        before = None
+    if before is not None and timezone.is_naive(before):
+        before = timezone.make_aware(before)
+
+    return limit, before
+
+
+def get_conversation_messages(conversation):
+    """
+    Return a conversation's messages, oldest first, ready to serialize.
+
+    The sender is joined in the same query, so serializing the nested
+    sender doesn't cost a query per message. Conversations without a
+    last message (e.g. just created) skip the query entirely.
+
+    Args:
+        conversation: Conversation instance
+
+    Returns:
+        QuerySet: The conversation's messages
+    """
+    if conversation.last_message_at is None:
+        # Set for every new message by update_conversation_on_message
+        return PrivateMessage.objects.none()
+
+    return PrivateMessage.objects.filter(
+        conversation=conversation
+    ).select_related('sender').only(*PRIVATE_MESSAGE_FIELDS).order_by('timestamp')
+
+
 class ConversationListView(generics.ListAPIView):
     """
     API endpoint for listing user's conversations.
@@ -39,15 +106,26 @@ class ConversationListView(generics.ListAPIView):
         200: List of conversations with participants and last message info
     """
 
-    serializer_class = ConversationSerializer
+    serializer_class = ConversationListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        """Return conversations for the current user."""
+        """
+        Return conversations for the current user.
+
+        Unread counts are annotated and the last message is stored on the
+        conversation itself, so the page is serialized with a fixed number
+        of queries.
+        """
         user = self.request.user
         return Conversation.objects.filter(
             participants=user
-        ).order_by('-updated_at')
+        ).annotate(
+            unread_count=Count(
+                'messages',
+                filter=Q(messages__is_read=False) & ~Q(messages__sender=user)
+            )
+        ).prefetch_related('participants').order_by('-updated_at')
 
 
 class ConversationDetailView(generics.RetrieveAPIView):
@@ -82,9 +160,7 @@ class ConversationDetailView(generics.RetrieveAPIView):
         instance = self.get_object()
 
         # Get messages
-        messages = PrivateMessage.objects.filter(
-            conversation=instance
-        ).order_by('timestamp')
+        messages = get_conversation_messages(instance)
 
         # Serialize data
         conversation_data = ConversationSerializer(instance, context={'request': request}).data
@@ -126,9 +202,7 @@ class ConversationCreateView(APIView):
         conversation = serializer.save()
 
         # Get messages for the conversation
-        messages = PrivateMessage.objects.filter(
-            conversation=conversation
-        ).order_by('timestamp')
+        messages = get_conversation_messages(conversation)
 
         return Response({
             'conversation': ConversationSerializer(
@@ -179,13 +253,18 @@ class PrivateMessageHistoryView(generics.ListAPIView):
 
         return PrivateMessage.objects.filter(
             conversation=conversation
-        ).order_by('-timestamp')
+        ).select_related('sender').only(*PRIVATE_MESSAGE_FIELDS).order_by('-timestamp')
 
     def list(self, request, *args, **kwargs):
-        """Override list to return in chronological order."""
+        """Return the most recent messages in chronological order."""
+        limit, before = get_history_window(request)
         queryset = self.get_queryset()
-        # Reverse to show oldest first
-        messages = list(queryset)[::-1]
+        if before is not None:
+            queryset = queryset.filter(timestamp__lt=before)
+
+        messages = list(queryset[:limit])
+        # The page is fetched newest first; flip it in place
+        messages.reverse()
 
         serializer = self.get_serializer(messages, many=True)
         return Response(serializer.data)
@@ -212,14 +291,23 @@ class GlobalMessageHistoryView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        """Get global messages."""
-        return GlobalMessage.objects.all().order_by('-timestamp')
+        """Get global messages, newest first."""
+        # IDs grow with insertion order, so ordering by the primary key
+        # gives the same result as the timestamp and walks the PK index.
+        return GlobalMessage.objects.select_related('sender').only(
+            *GLOBAL_MESSAGE_FIELDS
+        ).order_by('-id')
 
     def list(self, request, *args, **kwargs):
-        """Override list to return in chronological order."""
+        """Return the most recent messages in chronological order."""
+        limit, before = get_history_window(request)
         queryset = self.get_queryset()
-        # Reverse to show oldest first
-        messages = list(queryset)[::-1]
+        if before is not None:
+            queryset = queryset.filter(timestamp__lt=before)
+
+        messages = list(queryset[:limit])
+        # The page is fetched newest first; flip it in place
+        messages.reverse()
 
         serializer = self.get_serializer(messages, many=True)
         return Response(serializer.data)
@@ -238,8 +326,9 @@ class MarkMessagesReadView(APIView):
         message_ids: List of message UUIDs to mark as read
 
     Response:
-        200: Success response
+        200: Number of messages that were marked as read
         400: Validation error
+        404: Conversation not found
     """
 
     permission_classes = [IsAuthenticated]
@@ -247,7 +336,9 @@ class MarkMessagesReadView(APIView):
     def post(self, request, *args, **kwargs):
         """Mark messages as read."""
         conversation_id = kwargs.get('conversation_id')
-        message_ids = request.data.get('message_ids', [])
+        serializer = MessageMarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        message_ids = serializer.validated_data['message_ids']
 
         if not message_ids:
             return Response(
@@ -255,26 +346,30 @@ class MarkMessagesReadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Verify user is a participant
-        conversation = Conversation.objects.filter(
+        # Mark messages as read; the participant check is part of the same
+        # UPDATE, so messages in other users' conversations never match
+        updated = PrivateMessage.objects.filter(
+            id__in=message_ids,
+            conversation_id=conversation_id,
+            conversation__participants=request.user,
+            is_read=False,
+        ).exclude(sender=request.user).update(is_read=True)
+
+        # Nothing matched: the messages may all be read already, or the
+        # conversation may not be the user's. Only the latter is an error.
+        if not updated and not Conversation.objects.filter(
             id=conversation_id,
             participants=request.user
-        ).first()
-
-        if not conversation:
+        ).exists():
             return Response(
                 {'detail': 'Conversation not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Mark messages as read
-        PrivateMessage.objects.filter(
-            id__in=message_ids,
-            conversation=conversation,
-            is_read=False,
-        ).exclude(sender=request.user).update(is_read=True)
-
-        return Response({'detail': 'Messages marked as read.'})
+        return Response({
+            'detail': 'Messages marked as read.',
+            'updated': updated,
+        })
 
 
 class GetOrCreateConversationView(APIView):
@@ -301,20 +396,16 @@ class GetOrCreateConversationView(APIView):
         """Get or create conversation with a user."""
         user = request.user
 
-        # Find existing 2-person conversation
-        from django.db.models import Count
-        conversation = Conversation.objects.annotate(
-            num_participants=Count('participants')
-        ).filter(
-            num_participants=2,
-            participants=user
-        ).filter(
-            participants__id=user_id
+        # Find the existing direct conversation with a single probe of the
+        # (user_low, user_high) unique index
+        user_low_id, user_high_id = sorted([user.id, user_id])
+        conversation = Conversation.objects.filter(
+            user_low_id=user_low_id,
+            user_high_id=user_high_id
         ).first()
 
         if not conversation:
             # Create new conversation
-            from apps.authentication.models import User
             try:
                 other_user = User.objects.get(id=user_id, is_active=True)
             except User.DoesNotExist:
@@ -323,13 +414,10 @@ class GetOrCreateConversationView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            conversation = Conversation.objects.create()
-            conversation.participants.add(user, other_user)
+            conversation, _ = Conversation.get_or_create_direct(user, other_user)
 
         # Get messages
-        messages = PrivateMessage.objects.filter(
-            conversation=conversation
-        ).order_by('timestamp')
+        messages = get_conversation_messages(conversation)
 
         return Response({
             'conversation': ConversationSerializer(
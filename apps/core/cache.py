@@ -0,0 +1,29 @@
+"""
+Direct access to the Redis server behind Django's cache.
+
+Some hot paths (presence, buffered writes) need Redis commands that the
+Django cache API doesn't expose, such as key scans or pipelines. This module
+hands out the underlying redis-py client when the default cache is
+Redis-backed, so callers can fall back to the plain cache API otherwise.
+"""
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+
+def get_redis_client():
+    """
+    Return the redis-py client used by the default cache.
+
+    The client shares the cache's connection pool for the primary server,
+    so it sees every write made through the cache API.
+
+    Returns:
+        Redis: The raw client, or None if the default cache is not
+        Redis-backed (e.g. the local memory fallback)
+    """
+    backend = caches['default']
+    if not isinstance(backend, RedisCache):
+        return None
+    # Django's Redis backend has no public accessor for its client
+    return backend._cache.get_client(write=True)
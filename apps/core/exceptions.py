@@ -59,16 +59,13 @@ def get_error_message(data):
         if 'detail' in data:
             return str(data['detail'])
 
-        # Handle field validation errors
-        messages = []
-        for field, errors in data.items():
-            if isinstance(errors, list):
-                for error in errors:
-                    messages.append(f"{field}: {error}")
-            else:
-                messages.append(f"{field}: {errors}")
-
-        return '; '.join(messages) if messages else 'An error occurred'
+        # Handle field validation errors, joined in a single pass
+        message = '; '.join(
+            f"{field}: {error}"
+            for field, errors in data.items()
+            for error in (errors if isinstance(errors, list) else (errors,))
+        )
+        return message or 'An error occurred'
 
     elif isinstance(data, list) and len(data) > 0:
         return str(data[0])
@@ -0,0 +1,26 @@
+"""
+Database index types that degrade gracefully across backends.
+
+Production runs on PostgreSQL, while development and the test suite use
+SQLite. PostgreSQL-specific index types would make migrations (and SQLite's
+table rebuilds, which re-create every index from the model state) fail on
+other backends; the classes here fall back to a plain index there.
+"""
+
+from django.contrib.postgres.indexes import BrinIndex
+from django.db.models import Index
+
+
+class PortableBrinIndex(BrinIndex):
+    """
+    BRIN index on PostgreSQL, regular index everywhere else.
+
+    The fallback keeps the same name and fields, so later migrations can
+    refer to the index on any backend.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        """Return the CREATE INDEX statement for the current backend."""
+        if schema_editor.connection.vendor != 'postgresql':
+            return Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
@@ -0,0 +1,102 @@
+"""
+Logging handlers used by the settings' LOGGING configuration.
+
+Django configures logging in every worker process as it starts, long
+before the first record is written. The handlers here avoid doing file
+system work at that point, and keep it off the threads that log.
+"""
+
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler that opens its file on the first record.
+
+    The log file is always opened lazily (``delay`` is forced on), and its
+    directory is created at that time if it doesn't exist yet, so workers
+    that never log to the file never touch the disk.
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        """Initialize the handler without opening the file."""
+        kwargs['delay'] = True
+        super().__init__(filename, *args, **kwargs)
+
+    def _open(self):
+        """Create the log directory if needed and open the log file."""
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class QueueListenerHandler(logging.Handler):
+    """
+    Hand records to other handlers on a background thread.
+
+    emit() puts a copy of the record on a queue and a QueueListener thread
+    passes it to the target handlers, which write it. Stream writes, file
+    writes and rotation then never block the logging thread, such as an
+    ASGI worker's event loop.
+
+    The copy is made by the stdlib ``QueueHandler.prepare()``: it renders
+    the message and any traceback into ``msg`` with a plain formatter, and
+    clears ``args``, ``exc_info`` and ``exc_text``. The target handlers'
+    formatters still apply their format strings, but see the traceback only
+    as part of the message text.
+
+    The listener thread started in a process doesn't survive a fork, e.g.
+    when gunicorn's ``--preload`` loads the settings in the master. A new
+    queue and listener thread are therefore started in each forked child,
+    which also keeps children from writing records queued in the parent.
+
+    The targets are other handlers of the same LOGGING configuration,
+    referred to with ``cfg://``. dictConfig creates handlers in name
+    order, so this handler's name must sort after theirs.
+
+    Attributes:
+        listener: The QueueListener feeding the target handlers
+    """
+
+    def __init__(self, handlers):
+        """
+        Start the listener thread for the target handlers.
+
+        Args:
+            handlers: List of target handlers, e.g. ``cfg://handlers.file``
+        """
+        super().__init__()
+        # dictConfig resolves cfg:// references on item access, not
+        # when the list is iterated
+        targets = [handlers[index] for index in range(len(handlers))]
+        self._queue = queue.SimpleQueue()
+        self._enqueuer = QueueHandler(self._queue)
+        self.listener = QueueListener(self._queue, *targets, respect_handler_level=True)
+        self.listener.start()
+        self._running = True
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _restart_in_child(self):
+        """Replace the queue and listener thread lost in a fork."""
+        if not self._running:
+            return
+        self._queue = queue.SimpleQueue()
+        self._enqueuer.queue = self._queue
+        self.listener = QueueListener(
+            self._queue, *self.listener.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def emit(self, record):
+        """Queue a record for the listener thread."""
+        self._enqueuer.emit(record)
+
+    def close(self):
+        """Write out queued records and stop the listener thread."""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+        super().close()
@@ -0,0 +1,37 @@
+"""
+Shared serializer base classes for the REST API.
+
+This module provides serializer building blocks used across LiquidChat's
+apps. They extend Django REST Framework's serializers with behaviour that
+is common to several endpoints.
+"""
+
+import copy
+
+from rest_framework import serializers
+
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that builds its fields once per class.
+
+    DRF rebuilds the field mapping on every instantiation by introspecting
+    the model, which is repeated for each request. This class caches the
+    result of ``get_fields()`` per serializer class and hands out shallow
+    copies, so each instance can still bind its own fields.
+
+    Only use this for serializers whose fields are plain (non-nested)
+    fields; nested serializers hold per-instance state.
+    """
+
+    _fields_cache = {}
+
+    def get_fields(self):
+        """Return a fresh copy of the cached field mapping."""
+        cls = self.__class__
+        if cls not in cls._fields_cache:
+            cls._fields_cache[cls] = super().get_fields()
+        return {
+            name: copy.copy(field)
+            for name, field in cls._fields_cache[cls].items()
+        }
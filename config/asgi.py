@@ -10,7 +10,6 @@ distributed real-time communication across multiple server instances.
 
 import os
 
-from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from django.core.asgi import get_asgi_application
@@ -25,16 +24,19 @@ django_asgi_app = get_asgi_application()
 from apps.chat.routing import websocket_urlpatterns
 from apps.chat.middleware import JwtAuthMiddleware
 
+# The WebSocket stack is built once at import; handshakes only run it.
+# JwtAuthMiddleware sets scope['user'] itself, so the session-based
+# AuthMiddlewareStack isn't needed.
+websocket_app = AllowedHostsOriginValidator(
+    JwtAuthMiddleware(
+        URLRouter(websocket_urlpatterns)
+    )
+)
+
 application = ProtocolTypeRouter({
     # HTTP requests are handled by Django's ASGI application
     "http": django_asgi_app,
 
     # WebSocket connections with authentication and routing
-    "websocket": AllowedHostsOriginValidator(
-        JwtAuthMiddleware(
-            AuthMiddlewareStack(
-                URLRouter(websocket_urlpatterns)
-            )
-        )
-    ),
+    "websocket": websocket_app,
 })
@@ -0,0 +1,59 @@
+"""
+Helpers for reading settings from environment variables.
+"""
+
+import os
+
+
+def read_env_file(path):
+    """
+    Parse a .env file of ``KEY=VALUE`` lines.
+
+    Blank lines, ``#`` comments and an ``export`` prefix are ignored.
+    Values may be wrapped in single or double quotes, which are removed;
+    unquoted values end at an inline `` #`` comment. Escape sequences are
+    not interpreted.
+
+    Args:
+        path: Path of the .env file
+
+    Returns:
+        dict: The variables, in file order
+    """
+    values = {}
+    with open(path, encoding='utf-8') as env_file:
+        for line in env_file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            key, sep, value = line.removeprefix('export ').partition('=')
+            key = key.strip()
+            if not sep or not key:
+                continue
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                value = value[1:-1]
+            else:
+                value = value.split(' #', 1)[0].rstrip()
+            values[key] = value
+    return values
+
+
+def csv_env(name, default='', extra=()):
+    """
+    Read a comma-separated list from an environment variable.
+
+    Items are stripped, empty items are dropped and duplicates are removed,
+    keeping the first occurrence. ``extra`` items are appended unless
+    already present.
+
+    Args:
+        name: Name of the environment variable
+        default: Value to parse when the variable isn't set
+        extra: Items that are always included
+
+    Returns:
+        list: The parsed items, in order
+    """
+    items = (item.strip() for item in os.environ.get(name, default).split(','))
+    return list(dict.fromkeys([*filter(None, items), *extra]))
@@ -10,14 +10,44 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
-import dotenv
+from .env import csv_env, read_env_file
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+ENV_PATH = BASE_DIR / '.env'
+SQLITE_PATH = BASE_DIR / 'db.sqlite3'
+
+
+def _load_env_once(path):
+    """
+    Copy variables from a .env file into os.environ once per environment.
+
+    Variables already set in the environment take precedence. A marker
+    variable is set afterwards; child processes (the runserver reloader,
+    spawned workers, management command subprocesses) inherit it together
+    with the loaded values and skip reading the file again.
+
+    The file isn't looked for at all where the platform injects the
+    environment (Render sets ``RENDER``), or when ``SKIP_DOTENV`` is set.
+
+    Args:
+        path: Path of the .env file, as a pathlib.Path
+    """
+    if (
+        os.environ.get('LIQUIDCHAT_ENV_LOADED')
+        or os.environ.get('SKIP_DOTENV')
+        or os.environ.get('RENDER')
+    ):
+        return
+
+    if path.is_file():
+        for key, value in read_env_file(path).items():
+            os.environ.setdefault(key, value)
+    os.environ['LIQUIDCHAT_ENV_LOADED'] = '1'
+
 
 # Load environment variables from .env file (if exists)
-if os.path.exists(os.path.join(BASE_DIR, '.env')):
-    dotenv.load_dotenv()
+_load_env_once(ENV_PATH)
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get(
@@ -28,12 +58,12 @@ SECRET_KEY = os.environ.get(
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get('DEBUG', 'True').lower() in ('true', '1', 'yes')
 
-ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '*').split(',')
-if 'pythonanywhere.com' not in str(ALLOWED_HOSTS):
-     ALLOWED_HOSTS.append('.pythonanywhere.com')
+ALLOWED_HOSTS = csv_env('ALLOWED_HOSTS', '*')
+if not any(host.endswith('pythonanywhere.com') for host in ALLOWED_HOSTS):
+    ALLOWED_HOSTS.append('.pythonanywhere.com')
 
 # Application definition
-INSTALLED_APPS = [
+INSTALLED_APPS = (
     'daphne',  # ASGI server must be first
     'django.contrib.admin',
     'django.contrib.auth',
@@ -51,9 +81,9 @@ INSTALLED_APPS = [
     # Local apps
     'apps.authentication',
     'apps.chat',
-]
+)
 
-MIDDLEWARE = [
+MIDDLEWARE = (
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files efficiently
@@ -63,7 +93,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
+)
 
 ROOT_URLCONF = 'config.urls'
 
@@ -96,26 +126,38 @@ if os.environ.get('DB_NAME'):
             'PASSWORD': os.environ.get('DB_PASSWORD', ''),
             'HOST': os.environ.get('DB_HOST', 'localhost'),
             'PORT': os.environ.get('DB_PORT', '5432'),
+            # Reuse connections across requests and consumer database calls
+            # (database_sync_to_async closes only connections past their
+            # age), checking a reused connection once before its first query.
             'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': SQLITE_PATH,
         }
     }
 
+# Redis server used by the channel layer and the cache. A co-located server
+# can be reached over its unix socket, e.g. unix:///run/redis/redis.sock,
+# which skips the TCP stack on every group send.
+REDIS_URL = os.environ.get('REDIS_URL')
+
 # Channel Layer configuration (Redis with In-Memory fallback)
-if os.environ.get('REDIS_URL') or os.environ.get('REDIS_HOST'):
+# The Pub/Sub layer sends a group message with one PUBLISH and lets Redis
+# fan it out to subscribed workers, instead of queueing a copy per member.
+if REDIS_URL or os.environ.get('REDIS_HOST'):
     CHANNEL_LAYERS = {
         'default': {
-            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'BACKEND': 'channels_redis.pubsub.RedisPubSubChannelLayer',
             'CONFIG': {
-                'hosts': [(os.environ.get('REDIS_HOST', 'localhost'), 6379)],
-                'capacity': 1500,
-                'expiry': 60,
+                # REDIS_HOST/REDIS_PORT are still accepted without REDIS_URL
+                'hosts': [REDIS_URL or 'redis://{}:{}'.format(
+                    os.environ['REDIS_HOST'], os.environ.get('REDIS_PORT', '6379')
+                )],
             },
         },
     }
@@ -130,18 +172,24 @@ else:
 # Custom user model
 AUTH_USER_MODEL = 'authentication.User'
 
+# Password hashing
+# Argon2 is used for new passwords; the PBKDF2 hashers stay listed so
+# existing hashes keep verifying and are upgraded on login.
+PASSWORD_HASHERS = [
+    'apps.authentication.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = []
 
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
-USE_I18N = True
+USE_I18N = False  # English only; skips loading translation catalogs
 USE_TZ = True
 
-# Static files (CSS, JavaScript, Images)
-STATIC_URL = 'static/'
-
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -156,21 +204,41 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'EXCEPTION_HANDLER': 'apps.core.exceptions.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 # JWT Authentication settings
+# HS256 (the default) is the cheapest to sign and verify. Set JWT_ALGORITHM
+# to an asymmetric algorithm (e.g. EdDSA, RS256) together with PEM encoded
+# JWT_PRIVATE_KEY/JWT_PUBLIC_KEY when other services must verify tokens
+# without holding the secret. simplejwt parses the keys once per process.
+JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+if JWT_ALGORITHM.startswith('HS'):
+    JWT_SIGNING_KEY = SECRET_KEY
+    JWT_VERIFYING_KEY = ''
+else:
+    JWT_SIGNING_KEY = os.environ['JWT_PRIVATE_KEY'].replace('\\n', '\n')
+    JWT_VERIFYING_KEY = os.environ['JWT_PUBLIC_KEY'].replace('\\n', '\n')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
-    'ALGORITHM': 'HS256',
-    'SIGNING_KEY': SECRET_KEY,
+    'ALGORITHM': JWT_ALGORITHM,
+    'SIGNING_KEY': JWT_SIGNING_KEY,
+    'VERIFYING_KEY': JWT_VERIFYING_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    # Revoked refresh tokens are kept in the cache (see
+    # apps.authentication.tokens) instead of the token_blacklist app.
+    'TOKEN_REFRESH_SERIALIZER': 'apps.authentication.serializers.TokenRefreshSerializer',
 }
 
 # CORS settings
@@ -189,17 +257,12 @@ if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
     X_FRAME_OPTIONS = 'DENY'
 
-# Redis configuration for caching and presence
-REDIS_URL = os.environ.get('REDIS_URL')
-
+# Cache configuration (Redis from REDIS_URL, used for presence too)
 if REDIS_URL:
     CACHES = {
         "default": {
-            "BACKEND": "django_redis.cache.RedisCache",
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
             "LOCATION": REDIS_URL,
-            "OPTIONS": {
-                "CLIENT_CLASS": "django_redis.client.DefaultClient",
-            }
         }
     }
 else:
@@ -221,6 +284,9 @@ PRESENCE_EXPIRY = 60  # seconds
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# No template uses {% static %}, so hashed names buy nothing; skipping the
+# manifest means workers don't load staticfiles.json and a missing entry
+# can't break a page. Files are still pre-compressed by collectstatic.
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 
@@ -1,9 +1,14 @@
 """
 Production settings for LiquidChat.
 Import base settings and override for production deployment.
+
+Only settings that differ from the base module belong here; the database
+(PostgreSQL via DB_* variables, SQLite otherwise) and static files are
+configured there.
 """
 
 from .settings import *
+from .env import csv_env
 import os
 
 # Security Settings
@@ -12,13 +17,10 @@ SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
 if not SECRET_KEY:
     raise ValueError("DJANGO_SECRET_KEY environment variable must be set in production")
 
-ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '').split(',')
-if not ALLOWED_HOSTS or ALLOWED_HOSTS == ['']:
-    # Fallback to a broader match if no specific host is provided
-    ALLOWED_HOSTS = ['localhost', '127.0.0.1', '.onrender.com']
-else:
-    # Ensure standard hosts are always included
-    ALLOWED_HOSTS += ['localhost', '127.0.0.1', '.onrender.com']
+# Standard hosts are always included, after any configured ones
+ALLOWED_HOSTS = csv_env(
+    'ALLOWED_HOSTS', extra=('localhost', '127.0.0.1', '.onrender.com')
+)
 
 # HTTPS/SSL Settings
 SECURE_SSL_REDIRECT = True
@@ -37,28 +39,6 @@ CSRF_TRUSTED_ORIGINS = [
     'https://*.pythonanywhere.com'
 ]
 
-# Database - Use environment variables with SQLite fallback
-if os.environ.get('DB_NAME'):
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.environ.get('DB_NAME'),
-            'USER': os.environ.get('DB_USER'),
-            'PASSWORD': os.environ.get('DB_PASSWORD'),
-            'HOST': os.environ.get('DB_HOST'),
-            'PORT': os.environ.get('DB_PORT', '5432'),
-            'CONN_MAX_AGE': 600,
-        }
-    }
-else:
-    # Use SQLite if no Postgres is provided (Free tier friendly)
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-        }
-    }
-
 # Redis/Channels - Robust Fallback
 REDIS_URL = os.environ.get('REDIS_URL', '')
 
@@ -78,34 +58,26 @@ if not REDIS_URL.startswith(('redis://', 'rediss://', 'unix://')):
         }
     }
 else:
-    # Use Redis
+    # Use Redis; group sends are a single PUBLISH fanned out by Redis
     CHANNEL_LAYERS = {
         'default': {
-            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'BACKEND': 'channels_redis.pubsub.RedisPubSubChannelLayer',
             'CONFIG': {
                 'hosts': [REDIS_URL],
-                'capacity': 1500,
-                'expiry': 10,
             },
         },
     }
     
     CACHES = {
         'default': {
-            'BACKEND': 'django_redis.cache.RedisCache',
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
             'LOCATION': REDIS_URL,
-            'OPTIONS': {
-                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-            }
         }
     }
 
-# Static files
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATIC_URL = '/static/'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
-
 # Logging
+LOG_PATH = BASE_DIR / 'logs' / 'liquidchat.log'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -121,25 +93,33 @@ LOGGING = {
             'formatter': 'verbose',
         },
         'file': {
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': os.path.join(BASE_DIR, 'logs', 'liquidchat.log'),
+            # Opens the file (and creates logs/) on the first record only.
+            'class': 'apps.core.logging_handlers.LazyRotatingFileHandler',
+            'filename': LOG_PATH,
+            'delay': True,
             'maxBytes': 1024 * 1024 * 15,  # 15MB
             'backupCount': 10,
             'formatter': 'verbose',
         },
+        # Loggers use this one; console and file output happen on its
+        # listener thread, so logging never waits on I/O.
+        'queue': {
+            'class': 'apps.core.logging_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+        },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'apps': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -147,8 +127,6 @@ LOGGING = {
 }
 
 # CORS - Restrict in production
-# CORS - Restrict in production
-CORS_ALLOWED_ORIGINS = [url for url in os.environ.get('CORS_ALLOWED_ORIGINS', '').split(',') if url]
-if not CORS_ALLOWED_ORIGINS:
-    CORS_ALLOWED_ORIGINS = ['https://liquidchat-s3bl.onrender.com']
-CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOWED_ORIGINS = (
+    csv_env('CORS_ALLOWED_ORIGINS') or ['https://liquidchat-s3bl.onrender.com']
+)
@@ -0,0 +1,13 @@
+"""
+Settings for WSGI workers.
+
+WSGI workers only serve HTTP, so the ASGI-only apps are left out.
+Importing the daphne app installs the Twisted reactor, which a WSGI
+process never runs.
+"""
+
+from .settings import *
+
+INSTALLED_APPS = tuple(
+    app for app in INSTALLED_APPS if app not in ('daphne', 'channels')
+)
@@ -5,12 +5,13 @@ It exposes the WSGI callable as a module-level variable named ``application``.
 
 This module handles traditional HTTP requests using the WSGI standard.
 For WebSocket connections, use the ASGI configuration (config/asgi.py) instead.
+By default it loads config.settings_wsgi, which leaves out the ASGI-only apps.
 """
 
 import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings_wsgi')
 
 application = get_wsgi_application()
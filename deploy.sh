@@ -20,7 +20,7 @@ source venv/bin/activate
 echo "📦 Installing production dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt
-pip install gunicorn whitenoise django-redis
+pip install gunicorn whitenoise
 
 # Check for .env.production
 if [ ! -f ".env.production" ]; then